@@ -7,20 +7,144 @@ NEW: Added early stopping feature to terminate generation when perfect HDL is fo
 NEW: Added self-refinement feature to iteratively fix HDL errors using iverilog feedback
 """
 
+import bisect
+import hashlib
+import heapq
 import json
+import threading
 import time
 import os
 import re
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from functools import lru_cache
 from pathlib import Path
 from typing import List, Dict, Optional, Tuple
 from datetime import datetime
 from config import Config
 from llm_interface import create_llm_interface
 from hdl_tester_enhanced import MultiDatasetHDLTester
-from utils import load_designs
+from utils import load_designs, TokenBucket
 from quality_evaluator import HDLQualityEvaluator
 from cache_manager import HDLCacheManager, GlobalCacheManager
 
+try:
+    import orjson  # Fast JSON for the per-layer journal appends
+except ImportError:
+    orjson = None
+
+# Precompiled patterns for validation, extraction and prompt building - these
+# run on every candidate and refinement iteration, so hoist the pattern
+# parsing out of the hot path
+_MODULE_RE = re.compile(r'module\s+\w+', re.IGNORECASE)
+_ENDMODULE_RE = re.compile(r'endmodule', re.IGNORECASE)
+_TOPMODULE_RE = re.compile(r'module\s+TopModule')
+_MODULE_NAME_RE = re.compile(r'Module name:\s*(\w+)')
+_CPP_FENCE_RE = re.compile(r'```(?:cpp|c\+\+|c)?\s*\n?', re.IGNORECASE)
+_PY_FENCE_RE = re.compile(r'```python\s*\n?', re.IGNORECASE)
+_TAIL_FENCE_RE = re.compile(r'```\s*$', re.MULTILINE)
+_CPP_START_RE = re.compile(r'^(#include|void |int |class |struct |using |namespace )')
+_PY_START_RE = re.compile(r'^(def |class |import |from )')
+
+# Implementations scoring at or below this are excluded from aggregation prompts
+_AGGREGATION_MIN_QUALITY = 0.1
+
+# Bump to invalidate previously cached LLM responses (prompt format changes etc.)
+_LLM_CACHE_VERSION = "v1"
+
+# Entries tracked by the incremental top-quality heap; comfortably above any
+# realistic n_select while keeping eviction cheap
+_TOPN_MAX_TRACKED = 32
+
+
+@lru_cache(maxsize=256)
+def _extract_module_name(description: str) -> str:
+    """Module name from an RTLLM description, cached per description string"""
+    match = _MODULE_NAME_RE.search(description)
+    return match.group(1) if match else "module_name"
+
+# Static prompt blocks, interned once at import. The dataset never changes
+# over a generator's lifetime, so __init__ binds the matching builder and the
+# hot prompt paths are branch-free string concatenation.
+_INITIAL_HEADER_VERILOGEVAL = """Generate SystemVerilog code for this specification.
+
+CRITICAL REQUIREMENTS:
+1. Module name MUST be exactly 'TopModule'
+2. Output ONLY the module code
+3. No markdown formatting
+4. No explanations
+
+Specification:
+"""
+
+_INITIAL_HEADER_RTLLM = """Generate Verilog code for this specification.
+
+CRITICAL REQUIREMENTS:
+1. Module name should be: {module_name}
+2. Output ONLY the module code
+3. No markdown formatting
+4. No explanations
+
+Specification:
+"""
+
+_AGG_HEADER_VERILOGEVAL = """Synthesize multiple SystemVerilog implementations into one superior solution.
+
+Requirements:
+- Combine the best practices from all implementations
+- Fix any errors or suboptimal designs found
+- Ensure syntactically correct and synthesizable SystemVerilog
+- Implement complete functionality as specified
+
+CRITICAL OUTPUT FORMAT:
+1. Module name MUST be exactly 'TopModule'
+2. Output ONLY the module code
+3. Start with: module TopModule
+4. End with: endmodule
+5. NO markdown formatting (no ```)
+6. NO explanations or text outside the module
+
+Original specification:
+"""
+
+_AGG_HEADER_RTLLM = """Synthesize multiple Verilog implementations into one superior solution.
+
+Requirements:
+- Combine the best practices from all implementations
+- Fix any errors or suboptimal designs found
+- Ensure syntactically correct and synthesizable Verilog
+- Implement complete functionality as specified
+
+CRITICAL OUTPUT FORMAT:
+1. Module name should be: {module_name}
+2. Output ONLY the module code
+3. Start with: module {module_name}
+4. End with: endmodule
+5. NO markdown formatting (no ```)
+6. NO explanations or text outside the module
+
+Original specification:
+"""
+
+# Error-message pattern -> guidance key, checked in order; falls back to the
+# reported error_type when no pattern matches
+_ERR_PATTERNS = [
+    (re.compile(r'Unknown module type'), 'compilation_unknown_module'),
+    (re.compile(r'syntax error', re.IGNORECASE), 'syntax_error'),
+]
+
+
+def _eval_worker(args: Tuple[str, str, str, str]) -> Tuple[float, Dict]:
+    """
+    Evaluate one HDL candidate in a worker process
+
+    Reconstructs a lightweight HDLQualityEvaluator from picklable arguments
+    (dataset_dir, dataset, code, design_name) so the pool never has to
+    serialize the generator itself.
+    """
+    dataset_dir, dataset, code, design_name = args
+    evaluator = HDLQualityEvaluator(Path(dataset_dir), dataset)
+    return evaluator.evaluate_quality_with_details(code, design_name)
+
 
 class DualLayerCacheManager(HDLCacheManager):
     """
@@ -37,6 +161,30 @@ class DualLayerCacheManager(HDLCacheManager):
             "cpp": [],
             "python": []
         }
+
+        # Layers are dense 0..num_layers, so a flat list avoids the
+        # str(layer_idx) keying of the parent and serializes as a plain
+        # JSON array (grown on demand in add_layer_outputs_with_intermediate)
+        self.cache_data["layer_outputs"] = []
+
+        # Running best intermediate per language plus a layer-ordered index,
+        # so per-layer lookups avoid rescanning the whole history
+        self._best_intermediate = {"cpp": None, "python": None}
+        self._intermediate_layers = {"cpp": [], "python": []}
+
+        # Incremental top-quality tracking: a bounded min-heap of
+        # (quality, -seq, entry) updated on insert, so the per-layer
+        # get_top_quality_codes call needs no full rescan-and-sort
+        self._topn_heap = []
+        self._entry_seq = 0
+
+        # Append-only journal for per-layer updates - the full JSON snapshot
+        # is rewritten only at finalize(), so total cache I/O stays
+        # proportional to new bytes instead of growing quadratically in layers
+        self._jsonl_file = self.trial_cache_dir / f"{design_name}_layers.jsonl"
+        if self._jsonl_file.exists():
+            self._jsonl_file.unlink()
+        self._jsonl = open(self._jsonl_file, 'ab', buffering=1 << 16)
     
     def add_layer_outputs_with_intermediate(self, layer_idx: int, hdl_outputs: List[Dict]):
         """
@@ -50,11 +198,14 @@ class DualLayerCacheManager(HDLCacheManager):
         - intermediate: Dict with 'language' and 'code' (optional)
         - original_quality: Original quality before refinement (for intermediate code eval)
         """
-        layer_key = str(layer_idx)
-        
-        if layer_key not in self.cache_data["layer_outputs"]:
-            self.cache_data["layer_outputs"][layer_key] = []
-        
+        layers = self.cache_data["layer_outputs"]
+        while len(layers) <= layer_idx:
+            layers.append([])
+        layer_entries = layers[layer_idx]
+
+        # One timestamp per batch - the entries are cached together anyway
+        cached_at = datetime.now().isoformat()
+
         for hdl_output in hdl_outputs:
             hdl_entry = {
                 "code": hdl_output["code"],
@@ -62,7 +213,7 @@ class DualLayerCacheManager(HDLCacheManager):
                 "quality_score": hdl_output["quality_score"],
                 "path": hdl_output.get("path", "unknown"),
                 "layer_idx": layer_idx,
-                "cached_at": datetime.now().isoformat(),
+                "cached_at": cached_at,
                 "generation_info": hdl_output.get("generation_info", {})
             }
             
@@ -81,43 +232,114 @@ class DualLayerCacheManager(HDLCacheManager):
                     "language": intermediate["language"],
                     "hdl_quality": intermediate_quality,  # Use original quality
                     "layer_idx": layer_idx,
-                    "hdl_reference_idx": len(self.cache_data["layer_outputs"][layer_key])
+                    "hdl_reference_idx": len(layer_entries)
                 }
                 
                 self.cache_data["intermediate_codes"][intermediate["language"]].append(
                     intermediate_entry
                 )
+                self._intermediate_layers[intermediate["language"]].append(layer_idx)
+
+                # Track the running best so unbounded lookups are O(1)
+                best = self._best_intermediate[intermediate["language"]]
+                if best is None or intermediate_quality > best["hdl_quality"]:
+                    self._best_intermediate[intermediate["language"]] = intermediate_entry
             else:
                 hdl_entry["has_intermediate"] = False
             
-            self.cache_data["layer_outputs"][layer_key].append(hdl_entry)
-        
+            layer_entries.append(hdl_entry)
+
+            # Keep the running top-quality heap current (negated sequence so
+            # ties resolve to the earlier entry, matching stable sort order)
+            heapq.heappush(
+                self._topn_heap,
+                (hdl_entry["quality_score"], -self._entry_seq, hdl_entry)
+            )
+            self._entry_seq += 1
+            if len(self._topn_heap) > _TOPN_MAX_TRACKED:
+                heapq.heappop(self._topn_heap)
+
         # Update metadata
         self.cache_data["total_layers"] = max(self.cache_data["total_layers"], layer_idx + 1)
-        self.cache_data["metadata"]["total_hdl_codes"] = sum(
-            len(outputs) for outputs in self.cache_data["layer_outputs"].values()
-        )
-        
+        self.cache_data["metadata"]["total_hdl_codes"] += len(hdl_outputs)
+
+        # Journal the new layer instead of rewriting the whole cache file
+        try:
+            record = {"layer": layer_idx, "entries": hdl_outputs}
+            if orjson is not None:
+                line = orjson.dumps(record) + b'\n'
+            else:
+                line = (json.dumps(record, ensure_ascii=False) + '\n').encode('utf-8')
+            self._jsonl.write(line)
+        except Exception as e:
+            print(f"Warning: Failed to journal layer {layer_idx} for "
+                  f"{self.design_name} t{self.trial_num}: {e}")
+
+    def get_top_quality_codes(self, n: int, up_to_layer: Optional[int] = None) -> List[Dict]:
+        """
+        Get top n HDL codes by quality score from cache
+
+        The unbounded case reads the incrementally maintained top-quality
+        heap; layer-filtered lookups slice the list-backed layout and sort
+        only the eligible prefix.
+        """
+        if up_to_layer is None and n <= _TOPN_MAX_TRACKED:
+            return [entry for _, _, entry in heapq.nlargest(n, self._topn_heap)]
+
+        layers = self.cache_data["layer_outputs"]
+        if up_to_layer is not None:
+            layers = layers[:up_to_layer + 1]
+
+        all_codes = [entry for outputs in layers for entry in outputs]
+        sorted_codes = sorted(all_codes, key=lambda x: x["quality_score"], reverse=True)
+        return sorted_codes[:n]
+
+    def get_layer_statistics(self) -> Dict:
+        """Get statistics about cached data (list-backed layout)"""
+        stats = {
+            "total_layers": self.cache_data["total_layers"],
+            "total_codes": self.cache_data["metadata"]["total_hdl_codes"],
+            "layers_breakdown": {}
+        }
+
+        for layer_idx, outputs in enumerate(self.cache_data["layer_outputs"]):
+            layer_stats = {
+                "count": len(outputs),
+                "avg_quality": sum(o["quality_score"] for o in outputs) / len(outputs) if outputs else 0,
+                "max_quality": max(o["quality_score"] for o in outputs) if outputs else 0,
+                "min_quality": min(o["quality_score"] for o in outputs) if outputs else 0,
+                "models": list(set(o["model"] for o in outputs))
+            }
+            stats["layers_breakdown"][layer_idx] = layer_stats
+
+        return stats
+
+    def finalize(self):
+        """Write the full cache snapshot and close the layer journal"""
         self._save_cache()
-    
+        try:
+            self._jsonl.close()
+        except Exception:
+            pass
+
     def get_best_intermediate_code(self, language: str, up_to_layer: Optional[int] = None) -> Optional[Dict]:
         """
         Get the highest quality intermediate code for a specific language
         
         Returns: Dict with 'code', 'language', 'hdl_quality' or None
         """
-        candidates = []
-        
-        for entry in self.cache_data["intermediate_codes"][language]:
-            if up_to_layer is not None and entry["layer_idx"] > up_to_layer:
-                continue
-            candidates.append(entry)
-        
-        if not candidates:
+        if up_to_layer is None:
+            best = self._best_intermediate[language]
+        else:
+            # Entries are appended in layer order, so bisect on the layer
+            # index bounds the scan to the eligible prefix
+            end = bisect.bisect_right(self._intermediate_layers[language], up_to_layer)
+            entries = self.cache_data["intermediate_codes"][language][:end]
+            best = max(entries, key=lambda x: x["hdl_quality"], default=None)
+
+        if best is None:
             return None
-        
-        # Return the one with highest HDL quality
-        best = max(candidates, key=lambda x: x["hdl_quality"])
+
         return {
             "code": best["code"],
             "language": best["language"],
@@ -125,6 +347,21 @@ class DualLayerCacheManager(HDLCacheManager):
         }
 
 
+def _compact_hdl(code: str, max_lines: int = 60) -> str:
+    """
+    Bound HDL context to the most informative lines
+
+    Long modules are cut to the header (ports, parameters) plus the tail,
+    which together carry most of what the aggregator needs; the middle is
+    elided. Short modules pass through untouched.
+    """
+    lines = code.splitlines()
+    if len(lines) <= max_lines:
+        return code
+    head = max_lines // 3
+    return '\n'.join(lines[:head] + ['// ... [middle elided] ...'] + lines[-(max_lines - head):])
+
+
 class MoAHLSGenerator:
     """
     Multi-path MoA Generator with Configurable Intermediate Agents
@@ -135,7 +372,8 @@ class MoAHLSGenerator:
                  temp_mode: str = "low_T", enable_quality_caching: bool = True,
                  n_select: int = 3, path_config: List[str] = None,
                  enable_early_stopping: bool = False, enable_self_refinement: bool = False,
-                 max_self_refinement_iterations: int = 3):
+                 max_self_refinement_iterations: int = 3, enable_llm_caching: bool = False,
+                 enable_batched_paths: bool = False, requests_per_minute: int = 0):
         """
         Initialize MoA-HLS Generator
         
@@ -153,6 +391,12 @@ class MoAHLSGenerator:
             enable_early_stopping: True to stop generation when perfect HDL (score=1.0) is found
             enable_self_refinement: True to iteratively fix HDL errors using iverilog feedback
             max_self_refinement_iterations: Maximum refinement iterations (default: 3)
+            enable_llm_caching: True to cache LLM responses on disk keyed by
+                prompt hash, short-circuiting duplicate calls across trials
+            enable_batched_paths: True to request all paths in one JSON-mode
+                LLM call per layer, falling back to per-path calls on failure
+            requests_per_minute: API request quota enforced via a token
+                bucket before each LLM call; 0 disables pacing entirely
         """
         self.model = model
         self.num_layers = num_layers
@@ -162,9 +406,37 @@ class MoAHLSGenerator:
         self.n_select = n_select
         self.enable_early_stopping = enable_early_stopping
         self.enable_self_refinement = enable_self_refinement
+        self.enable_batched_paths = enable_batched_paths
         
         # Self-refinement parameters (only effective when quality caching is enabled)
         self.max_self_refinement_iterations = max_self_refinement_iterations
+
+        # Memoized refinement results keyed by (code hash, design) - identical
+        # HDL from convergent paths skips the whole refinement loop
+        self._refine_cache = {}
+
+        # Rendered-prompt cache keyed by (kind, description): the fixed
+        # per-design prompts are built once instead of once per trial/layer
+        self._prompt_cache = {}
+
+        # Dataset is fixed for this generator's lifetime - bind the
+        # specialized prompt builders once so the hot paths never branch
+        if dataset == "verilogeval":
+            self._build_initial = self._build_initial_verilogeval
+            self._build_aggregation_header = self._build_aggregation_header_verilogeval
+            self._aggregation_trailer = "\n\nOutput the synthesized SystemVerilog module:"
+        else:
+            self._build_initial = self._build_initial_rtllm
+            self._build_aggregation_header = self._build_aggregation_header_rtllm
+            self._aggregation_trailer = "\n\nOutput the synthesized Verilog module:"
+
+        # Optional request pacing - replaces fixed sleeps between trials, so
+        # unthrottled runs pay zero dead time and throttled runs only block
+        # when actually near the quota
+        if requests_per_minute > 0:
+            self.rate_limiter = TokenBucket(requests_per_minute / 60.0)
+        else:
+            self.rate_limiter = None
         
         # Disable self-refinement if quality caching is disabled
         if self.enable_self_refinement and not self.enable_quality_caching:
@@ -188,9 +460,18 @@ class MoAHLSGenerator:
         # Initialize quality evaluator if caching enabled
         if self.enable_quality_caching:
             self.quality_evaluator = HDLQualityEvaluator(self.dataset_dir, dataset)
+            # Process pool for batch iverilog evaluations - each evaluation
+            # forks iverilog/vvp and is fully independent, so candidates from
+            # the same layer can be scored in parallel across cores
+            self._eval_pool = ProcessPoolExecutor(max_workers=os.cpu_count())
         else:
             self.quality_evaluator = None
+            self._eval_pool = None
         
+        # Thread pool for per-path generation within a layer - paths are
+        # network-bound, so threads suffice; one worker per configured path
+        self._path_pool = ThreadPoolExecutor(max_workers=len(self.path_config))
+
         # Initialize LLM interface - Modified: Support both Ollama and OpenAI models
         self.llm = create_llm_interface(model, temp_mode)
         
@@ -200,9 +481,8 @@ class MoAHLSGenerator:
             "num_predict": 4096,
             "timeout": 180
         }
-        base_params = Config.get_model_params(model, temp_mode)
-        base_params.update(moa_params)
-        self.llm.params = base_params
+        # get_model_params returns a shared read-only mapping
+        self.llm.params = {**Config.get_model_params(model, temp_mode), **moa_params}
         
         # Set file extension and language
         self.file_extension = Config.get_file_extension(dataset)
@@ -214,11 +494,24 @@ class MoAHLSGenerator:
         # Setup cache directory if quality caching enabled
         if self.enable_quality_caching:
             self.setup_cache_directory()
+            # Persist evaluation results across trials and runs
+            self.quality_evaluator.attach_disk_cache(self.cache_dir / "eval_cache.db")
         else:
             self.cache_dir = None
             self.global_cache_manager = None
-        
-        # Setup system prompts
+
+        # Optional on-disk LLM response cache - duplicate prompts across
+        # trials and layers skip the network round-trip entirely
+        if enable_llm_caching:
+            llm_cache_base = self.cache_dir if self.enable_quality_caching else self.verilog_dir
+            self.llm_cache_dir = llm_cache_base / "llm_cache"
+            self.llm_cache_dir.mkdir(parents=True, exist_ok=True)
+        else:
+            self.llm_cache_dir = None
+
+        # Setup system prompts. Prompt builders keep invariant instruction
+        # blocks as the leading bytes and append per-call content at the end,
+        # so providers with prefix caching can reuse KV state across calls.
         self.setup_system_prompts()
     
     def setup_directories(self):
@@ -257,9 +550,13 @@ class MoAHLSGenerator:
         self.verilog_dir.mkdir(parents=True, exist_ok=True)
         self.result_dir.mkdir(parents=True, exist_ok=True)
         
-        # Create trial directories
+        # Create trial directories once and keep their rendered paths - the
+        # per-trial write loop then skips Path construction entirely
+        self._trial_dirs = [""]  # 1-based indexing by trial_num
         for i in range(1, Config.N_SAMPLES + 1):
-            (self.verilog_dir / f"t{i}").mkdir(exist_ok=True)
+            trial_dir = self.verilog_dir / f"t{i}"
+            trial_dir.mkdir(exist_ok=True)
+            self._trial_dirs.append(str(trial_dir))
     
     def setup_cache_directory(self):
         """Setup cache directory for intermediate storage"""
@@ -341,59 +638,19 @@ class MoAHLSGenerator:
                 "Focus on the specific error messages and fix ONLY what's broken. "
                 "Output clean, corrected code without explanations."
             )
-    
-    def generate_refinement_prompt(self, original_code: str, error_type: str,
-                                   error_message: str, description: str, 
-                                   iteration: int, intermediate_code: Optional[str] = None,
-                                   intermediate_language: Optional[str] = None) -> str:
-        """
-        Generate refinement prompt for HDL code
-        
-        Args:
-            original_code: The HDL code that failed
-            error_type: 'syntax_error', 'compilation_error', or 'simulation_fail'
-            error_message: Error message from iverilog/vvp
-            description: Original design specification
-            iteration: Current refinement iteration (1-based)
-            intermediate_code: Optional intermediate code (for cpp/python paths)
-            intermediate_language: Language of intermediate code ('cpp' or 'python')
-        """
-        # Base context
-        if intermediate_code and intermediate_language:
-            # For HLS paths: include intermediate code reference
-            base_context = f"""You are fixing {self.language} code that was translated from {intermediate_language.upper()}.
 
-Original specification:
-{description}
-
-{intermediate_language.upper()} reference implementation:
-{intermediate_code}
+        self.setup_refinement_sections()
 
-Current {self.language} code (Refinement attempt {iteration}/{self.max_self_refinement_iterations}):
-{original_code}
-
-Error encountered:
-{error_message}
-
-The {intermediate_language.upper()} reference is correct - focus on fixing the {self.language} translation.
-"""
-        else:
-            # For direct path: standard refinement
-            base_context = f"""You are debugging {self.language} code that failed testing.
-
-Original specification:
-{description}
-
-Current code (Refinement attempt {iteration}/{self.max_self_refinement_iterations}):
-{original_code}
+    def setup_refinement_sections(self):
+        """
+        Precompute the static sections of the refinement prompt
 
-Error encountered:
-{error_message}
-"""
-        
-        # Error-specific guidance
-        if error_type == "syntax_error":
-            specific_guidance = """
+        Guidance, output requirements and iteration notes are fully determined
+        by (error type, dataset, intermediate language), so they are built
+        once here and generate_refinement_prompt only assembles them.
+        """
+        self._refinement_guidance = {
+            "syntax_error": """
 SYNTAX ERROR DETECTED. Common issues:
 1. Variable/genvar redeclaration - check all loop variables and ensure unique naming
 2. Part select with non-constant expressions - use parameters or constants
@@ -401,11 +658,8 @@ SYNTAX ERROR DETECTED. Common issues:
 4. Incorrect port declarations or signal types
 
 Fix the syntax errors while preserving the original logic.
-"""
-        
-        elif error_type == "compilation_error":
-            if "Unknown module type" in error_message:
-                specific_guidance = """
+""",
+            "compilation_unknown_module": """
 MISSING/UNKNOWN MODULE ERROR. Possible causes:
 1. Module name mismatch with testbench expectations
 2. Missing submodule definitions - you must implement ALL modules in a single file
@@ -415,18 +669,15 @@ Solution:
 - Implement all required submodules in the SAME file
 - Ensure the top-level module name matches the testbench requirement
 - Use inline logic instead of module instantiation if appropriate
-"""
-            else:
-                specific_guidance = """
+""",
+            "compilation_error": """
 COMPILATION ERROR. Check:
 1. Module name matches testbench expectations
 2. Port declarations are correct
 3. All referenced signals are declared
 4. No circular dependencies
-"""
-        
-        elif error_type == "simulation_fail":
-            specific_guidance = """
+""",
+            "simulation_fail": """
 SIMULATION FAILURE. The code compiles but produces incorrect results.
 Possible issues:
 1. Logic errors in state machines or combinational logic
@@ -435,26 +686,31 @@ Possible issues:
 4. Incorrect bit widths or signal ranges
 
 Review and fix the functional logic while maintaining correct syntax.
-"""
-        
-        else:
-            specific_guidance = """
+""",
+            "other": """
 TESTING FAILED. Review the error message carefully and fix the issue.
-"""
-        
-        # Add HLS-specific guidance if intermediate code is present
-        if intermediate_code and intermediate_language:
-            specific_guidance += f"""
-Common issues when translating from {intermediate_language.upper()}:
+""",
+        }
+
+        self._hls_guidance = {
+            lang: f"""
+Common issues when translating from {lang.upper()}:
 1. Loop constructs (for/while) → always blocks with proper sensitivity
 2. Arrays/pointers → wire/reg arrays with correct indexing
 3. Functions → modules or combinational logic
 4. Sequential operations → state machines or pipelined logic
 """
-        
-        # Output requirements
-        if self.dataset == "verilogeval":
-            output_requirements = """
+            for lang in ("cpp", "python")
+        }
+
+        self._iteration_notes = {
+            1: "This is your first attempt to fix the error. Focus on the specific error message.",
+            2: "Previous fix attempt failed. Try a different approach - the issue might be more fundamental.",
+        }
+        self._iteration_note_late = ("Multiple fix attempts have failed. Consider simplifying the design "
+                                     "or using a completely different implementation approach.")
+
+        self._output_req_verilogeval = """
 CRITICAL OUTPUT REQUIREMENTS:
 1. Module name MUST be exactly 'TopModule'
 2. Output ONLY the complete, corrected SystemVerilog code
@@ -464,11 +720,19 @@ CRITICAL OUTPUT REQUIREMENTS:
 6. NO explanations - only code
 7. Include ALL necessary submodules in the SAME file if needed
 """
-        else:
-            module_name_match = re.search(r'Module name:\s*(\w+)', description)
-            module_name = module_name_match.group(1) if module_name_match else "module_name"
-            
-            output_requirements = f"""
+        # RTLLM requirements depend only on the module name; cache per name
+        self._output_req_rtllm_cache = {}
+
+    def _get_output_requirements(self, description: str) -> str:
+        """Look up the output-requirements section for the refinement prompt"""
+        if self.dataset == "verilogeval":
+            return self._output_req_verilogeval
+
+        module_name = _extract_module_name(description)
+
+        cached = self._output_req_rtllm_cache.get(module_name)
+        if cached is None:
+            cached = f"""
 CRITICAL OUTPUT REQUIREMENTS:
 1. Module name should be: {module_name}
 2. Output ONLY the complete, corrected Verilog code
@@ -478,38 +742,107 @@ CRITICAL OUTPUT REQUIREMENTS:
 6. NO explanations - only code
 7. Include ALL necessary submodules in the SAME file if needed
 """
+            self._output_req_rtllm_cache[module_name] = cached
+
+        return cached
+
+    def generate_refinement_prompt(self, original_code: str, error_type: str,
+                                   error_message: str, description: str, 
+                                   iteration: int, intermediate_code: Optional[str] = None,
+                                   intermediate_language: Optional[str] = None) -> str:
+        """
+        Generate refinement prompt for HDL code
         
-        # Iteration-specific encouragement
-        if iteration == 1:
-            iteration_note = "This is your first attempt to fix the error. Focus on the specific error message."
-        elif iteration == 2:
-            iteration_note = "Previous fix attempt failed. Try a different approach - the issue might be more fundamental."
+        Args:
+            original_code: The HDL code that failed
+            error_type: 'syntax_error', 'compilation_error', or 'simulation_fail'
+            error_message: Error message from iverilog/vvp
+            description: Original design specification
+            iteration: Current refinement iteration (1-based)
+            intermediate_code: Optional intermediate code (for cpp/python paths)
+            intermediate_language: Language of intermediate code ('cpp' or 'python')
+        """
+        # Base context
+        if intermediate_code and intermediate_language:
+            # For HLS paths: include intermediate code reference
+            base_context = f"""You are fixing {self.language} code that was translated from {intermediate_language.upper()}.
+
+Original specification:
+{description}
+
+{intermediate_language.upper()} reference implementation:
+{intermediate_code}
+
+Current {self.language} code (Refinement attempt {iteration}/{self.max_self_refinement_iterations}):
+{original_code}
+
+Error encountered:
+{error_message}
+
+The {intermediate_language.upper()} reference is correct - focus on fixing the {self.language} translation.
+"""
         else:
-            iteration_note = "Multiple fix attempts have failed. Consider simplifying the design or using a completely different implementation approach."
+            # For direct path: standard refinement
+            base_context = f"""You are debugging {self.language} code that failed testing.
+
+Original specification:
+{description}
+
+Current code (Refinement attempt {iteration}/{self.max_self_refinement_iterations}):
+{original_code}
+
+Error encountered:
+{error_message}
+"""
         
-        return f"""{base_context}
+        # Error-specific guidance: classify once via the compiled pattern
+        # table, falling back to the reported error_type (sections are
+        # precomputed in setup_refinement_sections)
+        guidance_key = next(
+            (tag for pattern, tag in _ERR_PATTERNS if pattern.search(error_message)),
+            error_type
+        )
+        guidance = self._refinement_guidance.get(guidance_key)
+        if guidance is None:
+            guidance = self._refinement_guidance["other"]
 
-{specific_guidance}
+        pieces = [base_context, "\n", guidance]
 
-{iteration_note}
+        # Add HLS-specific guidance if intermediate code is present
+        if intermediate_code and intermediate_language:
+            hls_guidance = self._hls_guidance.get(intermediate_language)
+            if hls_guidance is None:
+                hls_guidance = self._hls_guidance["cpp"].replace(
+                    "CPP", intermediate_language.upper()
+                )
+                self._hls_guidance[intermediate_language] = hls_guidance
+            pieces.append(hls_guidance)
 
-{output_requirements}
+        iteration_note = self._iteration_notes.get(iteration, self._iteration_note_late)
+        pieces.extend([
+            "\n", iteration_note, "\n",
+            self._get_output_requirements(description),
+            f"\nOutput the corrected {self.language} code now:",
+        ])
 
-Output the corrected {self.language} code now:"""
+        return "".join(pieces)
     
     def refine_hdl_code(self, original_code: str, design_name: str, description: str,
                        intermediate_code: Optional[str] = None,
-                       intermediate_language: Optional[str] = None) -> Tuple[str, float, int, float]:
+                       intermediate_language: Optional[str] = None,
+                       prior_eval: Optional[Tuple[float, Dict]] = None) -> Tuple[str, float, int, float]:
         """
         Iteratively refine HDL code using iverilog feedback
-        
+
         Args:
             original_code: Initial HDL code to refine
             design_name: Name of the design
             description: Original design specification
             intermediate_code: Optional intermediate code (for cpp/python paths)
             intermediate_language: Language of intermediate code ('cpp' or 'python')
-        
+            prior_eval: Optional (quality, error_details) the caller already
+                computed for original_code, to skip the initial evaluation
+
         Returns:
             Tuple of (best_code, final_quality, iterations_performed, original_quality)
         """
@@ -517,16 +850,26 @@ Output the corrected {self.language} code now:"""
             # Self-refinement disabled
             quality = self.quality_evaluator.evaluate_quality(original_code, design_name)
             return original_code, quality, 0, quality
-        
-        # Evaluate original code with details
-        quality, error_details = self.quality_evaluator.evaluate_quality_with_details(
-            original_code, design_name
-        )
+
+        refine_key = (HDLQualityEvaluator._cache_key(original_code), design_name)
+        cached_result = self._refine_cache.get(refine_key)
+        if cached_result is not None:
+            return cached_result
+
+        # Evaluate original code with details, unless the caller already did
+        if prior_eval is not None:
+            quality, error_details = prior_eval
+        else:
+            quality, error_details = self.quality_evaluator.evaluate_quality_with_details(
+                original_code, design_name
+            )
         original_quality = quality  # Store original quality for intermediate code eval
         
         # If already perfect, return immediately
         if error_details["passed"]:
-            return original_code, quality, 0, original_quality
+            result = (original_code, quality, 0, original_quality)
+            self._refine_cache[refine_key] = result
+            return result
         
         # Start refinement process
         best_code = original_code
@@ -546,7 +889,7 @@ Output the corrected {self.language} code now:"""
             )
             
             # Get refined code from LLM
-            response = self.llm.generate_response(refinement_prompt, self.system_prompt_refinement)
+            response = self._generate_hdl_response(refinement_prompt, self.system_prompt_refinement)
             
             if not response:
                 break  # LLM failed to respond
@@ -569,121 +912,132 @@ Output the corrected {self.language} code now:"""
             
             # Check if perfect
             if refined_error_details["passed"]:
-                return refined_code, refined_quality, iteration, original_quality
-            
+                result = (refined_code, refined_quality, iteration, original_quality)
+                self._refine_cache[refine_key] = result
+                return result
+
             # Prepare for next iteration
             current_code = refined_code
             error_details = refined_error_details
-        
-        return best_code, best_quality, self.max_self_refinement_iterations if iteration == self.max_self_refinement_iterations else iteration, original_quality
+
+        result = (best_code, best_quality,
+                  self.max_self_refinement_iterations if iteration == self.max_self_refinement_iterations else iteration,
+                  original_quality)
+        self._refine_cache[refine_key] = result
+        return result
     
     def extract_code(self, response: str) -> Optional[str]:
         """Extract HDL code from LLM response - reuse from OllamaInterface"""
+        # Fast path: a clean response spanning exactly "module ... endmodule"
+        # needs no regex work at all - this is the common case with the
+        # "NO explanations" prompts
+        if response:
+            stripped = response.strip()
+            if stripped.startswith('module ') and stripped.endswith('endmodule'):
+                if self.validate_hdl_code(stripped):
+                    return stripped
+
         return self.llm.extract_verilog(response, self.dataset)
     
     def validate_hdl_code(self, code: str) -> bool:
-        """Validate extracted HDL code"""
-        if not code:
-            return False
-        
-        if not re.search(r'module\s+\w+', code, re.IGNORECASE):
-            return False
-        
-        if not re.search(r'endmodule', code, re.IGNORECASE):
+        """
+        Validate extracted HDL code
+
+        Runs on every LLM response across paths, layers and refinement
+        iterations, so the common well-formed case is a single line scan;
+        the precompiled regexes only kick in for unusual layouts.
+        """
+        if not code:
             return False
-        
-        if self.dataset == "verilogeval":
-            if not re.search(r'module\s+TopModule', code):
-                return False
-        
+
         if '```' in code:
             return False
-        
-        module_count = len(re.findall(r'module\s+\w+', code, re.IGNORECASE))
-        endmodule_count = len(re.findall(r'endmodule', code, re.IGNORECASE))
-        
+
+        module_count = 0
+        endmodule_count = 0
+        has_topmodule = False
+        for line in code.splitlines():
+            stripped = line.lstrip()
+            lowered = stripped.lower()
+            if lowered.startswith('endmodule'):
+                endmodule_count += 1
+            elif lowered.startswith('module ') or lowered.startswith('module\t'):
+                module_count += 1
+                if _TOPMODULE_RE.match(stripped):
+                    has_topmodule = True
+
+        if module_count == 0 or endmodule_count == 0:
+            # Unusual layout (declaration mid-line or split across lines) -
+            # fall back to the regex checks
+            module_count = len(_MODULE_RE.findall(code))
+            endmodule_count = len(_ENDMODULE_RE.findall(code))
+            has_topmodule = bool(_TOPMODULE_RE.search(code))
+
         if module_count != 1 or endmodule_count != 1:
             return False
-        
+
+        if self.dataset == "verilogeval" and not has_topmodule:
+            return False
+
         return True
     
-    def extract_cpp_code(self, response: str) -> Optional[str]:
-        """Extract C++ code from LLM response"""
-        if not response:
-            return None
-        
-        # Remove markdown
-        response = re.sub(r'```(?:cpp|c\+\+|c)?\s*\n?', '', response, flags=re.IGNORECASE)
-        response = re.sub(r'```\s*$', '', response, flags=re.MULTILINE)
-        
-        # Look for includes, functions, or main
-        lines = response.split('\n')
-        code_lines = []
-        in_code = False
-        
-        for line in lines:
-            stripped = line.strip()
-            if re.match(r'^(#include|void |int |class |struct |using |namespace )', stripped):
-                in_code = True
-            if in_code:
-                code_lines.append(line)
-        
-        return '\n'.join(code_lines) if code_lines else response
-    
-    def extract_python_code(self, response: str) -> Optional[str]:
-        """Extract Python code from LLM response"""
+    def _extract_marked_code(self, response: str, start_re) -> Optional[str]:
+        """
+        Extract intermediate code in a single pass over the response
+
+        Markdown fences are dropped and the first code-start line located in
+        the same loop, instead of whole-text re.sub passes followed by a
+        second line scan.
+        """
         if not response:
             return None
-        
-        # Remove markdown
-        response = re.sub(r'```python\s*\n?', '', response, flags=re.IGNORECASE)
-        response = re.sub(r'```\s*$', '', response, flags=re.MULTILINE)
-        
-        # Look for function or class definitions
-        lines = response.split('\n')
+
         code_lines = []
+        clean_lines = []
         in_code = False
-        
-        for line in lines:
+
+        for line in response.splitlines():
             stripped = line.strip()
-            if re.match(r'^(def |class |import |from )', stripped):
+            if stripped.startswith('```'):
+                continue
+            clean_lines.append(line)
+            if not in_code and start_re.match(stripped):
                 in_code = True
             if in_code:
                 code_lines.append(line)
-        
-        return '\n'.join(code_lines) if code_lines else response
-    
-    def generate_initial_prompt(self, description: str) -> str:
-        """Generate initial direct generation prompt"""
-        if self.dataset == "verilogeval":
-            return f"""Generate SystemVerilog code for this specification.
 
-CRITICAL REQUIREMENTS:
-1. Module name MUST be exactly 'TopModule'
-2. Output ONLY the module code
-3. No markdown formatting
-4. No explanations
+        if code_lines:
+            return '\n'.join(code_lines)
+        return '\n'.join(clean_lines)
 
-Specification:
-{description}
+    def extract_cpp_code(self, response: str) -> Optional[str]:
+        """Extract C++ code from LLM response"""
+        return self._extract_marked_code(response, _CPP_START_RE)
 
-Output the SystemVerilog module:"""
-        else:
-            module_name_match = re.search(r'Module name:\s*(\w+)', description)
-            module_name = module_name_match.group(1) if module_name_match else "module_name"
-            
-            return f"""Generate Verilog code for this specification.
+    def extract_python_code(self, response: str) -> Optional[str]:
+        """Extract Python code from LLM response"""
+        return self._extract_marked_code(response, _PY_START_RE)
+    
+    def _build_initial_verilogeval(self, description: str) -> str:
+        return (_INITIAL_HEADER_VERILOGEVAL + description
+                + "\n\nOutput the SystemVerilog module:")
 
-CRITICAL REQUIREMENTS:
-1. Module name should be: {module_name}
-2. Output ONLY the module code
-3. No markdown formatting
-4. No explanations
+    def _build_initial_rtllm(self, description: str) -> str:
+        header = _INITIAL_HEADER_RTLLM.format(
+            module_name=_extract_module_name(description))
+        return header + description + "\n\nOutput the Verilog module:"
 
-Specification:
-{description}
+    def generate_initial_prompt(self, description: str) -> str:
+        """Generate initial direct generation prompt"""
+        # Rendered once per description: byte-identical prompts across
+        # trials/layers keep the LLM disk cache and server prefix cache hot
+        cached = self._prompt_cache.get(("initial", description))
+        if cached is not None:
+            return cached
 
-Output the Verilog module:"""
+        prompt = self._build_initial(description)
+        self._prompt_cache[("initial", description)] = prompt
+        return prompt
     
     def generate_aggregation_prompt(self, previous_hdl: List[Dict], description: str,
                                     intermediate_code: Optional[Dict] = None) -> str:
@@ -700,18 +1054,47 @@ Output the Verilog module:"""
             Formatted prompt for aggregation
         """
         
+        # Drop near-zero-quality implementations - they add prompt length
+        # (and LLM prefill cost) without giving the aggregator anything to
+        # synthesize. Keep the original list when nothing clears the bar,
+        # e.g. when quality caching is disabled and every score is 0.0.
+        candidates = [
+            entry for entry in previous_hdl
+            if entry.get("quality_score", 0) > _AGGREGATION_MIN_QUALITY
+        ]
+        if not candidates:
+            candidates = previous_hdl
+
+        # Dedupe whitespace-equivalent code; callers pass quality-sorted
+        # lists, so the first occurrence is the best representative. Track
+        # multiplicity so corroborated candidates are flagged, not hidden.
+        counts = {}
+        deduped = []
+        for entry in candidates:
+            key = HDLQualityEvaluator._cache_key(entry["code"])
+            if key in counts:
+                counts[key] += 1
+                continue
+            counts[key] = 1
+            deduped.append((key, entry))
+
         # Format previous HDL implementations
         hdl_text = ""
-        for i, entry in enumerate(previous_hdl[:3], 1):
+        for i, (key, entry) in enumerate(deduped[:3], 1):
             code = entry["code"]
             quality = entry.get("quality_score", 0)
             path = entry.get("path", "unknown")
-            
-            # Truncate long code
+
+            # Bound each candidate to header + tail lines, then cap raw
+            # length as a guard against pathologically long lines
+            code = _compact_hdl(code)
             if len(code) > 1500:
                 code = code[:1500] + "\n... [truncated for length]"
-            
-            hdl_text += f"\n[Implementation {i}] (quality: {quality:.2f}, path: {path})\n{code}\n"
+
+            # Duplicates were collapsed above; a multiplicity note tells the
+            # aggregator this version was independently produced n times
+            corroborated = f", produced by {counts[key]} paths" if counts[key] > 1 else ""
+            hdl_text += f"\n[Implementation {i}] (quality: {quality:.2f}, path: {path}{corroborated})\n{code}\n"
         
         # Add intermediate code reference if available
         intermediate_text = ""
@@ -729,77 +1112,181 @@ Additional reference - {lang} implementation (HDL quality: {quality:.2f}):
 {code}
 """
     
-        # Generate dataset-specific prompt
-        if self.dataset == "verilogeval":
-            return f"""Synthesize multiple SystemVerilog implementations into one superior solution.
+        # Assemble with the dataset-specialized header bound in __init__.
+        # Ordering invariant for provider prefix caching: the instruction
+        # blocks lead (byte-identical across calls, with only the per-design
+        # module name interpolated), followed by the per-design
+        # specification; the per-call hdl_text and intermediate_text go last
+        # so the shared leading tokens can reuse cached KV state across
+        # every aggregation call. The header is rendered once per design.
+        header = self._prompt_cache.get(("agg_header", description))
+        if header is None:
+            header = self._build_aggregation_header(description)
+            self._prompt_cache[("agg_header", description)] = header
 
-Original specification:
-{description}
+        return (header + hdl_text + "\n" + intermediate_text
+                + self._aggregation_trailer)
 
-Previous implementations to synthesize:
-{hdl_text}
-{intermediate_text}
+    def _build_aggregation_header_verilogeval(self, description: str) -> str:
+        return (_AGG_HEADER_VERILOGEVAL + description
+                + "\n\nPrevious implementations to synthesize:\n")
 
-Requirements:
-- Combine the best practices from all implementations
-- Fix any errors or suboptimal designs found
-- Ensure syntactically correct and synthesizable SystemVerilog
-- Implement complete functionality as specified
+    def _build_aggregation_header_rtllm(self, description: str) -> str:
+        header = _AGG_HEADER_RTLLM.format(
+            module_name=_extract_module_name(description))
+        return header + description + "\n\nPrevious implementations to synthesize:\n"
+    
+    def _llm_cache_path(self, prompt: str, system_role: str) -> Path:
+        """Map a (model, temperature, system, prompt) tuple to its cache file"""
+        key_src = "\x1f".join([
+            _LLM_CACHE_VERSION,
+            self.model,
+            str(self.llm.params.get("temperature", "")),
+            system_role or "",
+            prompt
+        ])
+        key = hashlib.sha256(key_src.encode('utf-8')).hexdigest()
+        return self.llm_cache_dir / key[:2] / key
 
-CRITICAL OUTPUT FORMAT:
-1. Module name MUST be exactly 'TopModule'
-2. Output ONLY the module code
-3. Start with: module TopModule
-4. End with: endmodule
-5. NO markdown formatting (no ```)
-6. NO explanations or text outside the module
+    def _llm_cache_get(self, prompt: str, system_role: str) -> Optional[str]:
+        """Return a previously cached response, or None on miss/disabled"""
+        if self.llm_cache_dir is None:
+            return None
 
-Output the synthesized SystemVerilog module:"""
-    
-        else:  # rtllm
-            module_name_match = re.search(r'Module name:\s*(\w+)', description)
-            module_name = module_name_match.group(1) if module_name_match else "module_name"
-            
-            return f"""Synthesize multiple Verilog implementations into one superior solution.
+        cache_path = self._llm_cache_path(prompt, system_role)
+        try:
+            if cache_path.exists():
+                with open(cache_path, 'rb') as f:
+                    raw = f.read()
+                if orjson is not None:
+                    return orjson.loads(raw)["response"]
+                return json.loads(raw)["response"]
+        except Exception:
+            pass
+        return None
 
-Original specification:
-{description}
+    def _llm_cache_put(self, prompt: str, system_role: str, response: Optional[str]):
+        """Persist a response; written atomically so partial files never load"""
+        if self.llm_cache_dir is None or not response:
+            return
 
-Previous implementations to synthesize:
-{hdl_text}
-{intermediate_text}
+        cache_path = self._llm_cache_path(prompt, system_role)
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+            if orjson is not None:
+                payload = orjson.dumps({"response": response})
+            else:
+                payload = json.dumps({"response": response}, ensure_ascii=False).encode('utf-8')
+            with open(tmp_path, 'wb') as f:
+                f.write(payload)
+            os.replace(tmp_path, cache_path)
+        except Exception:
+            pass
 
-Requirements:
-- Combine the best practices from all implementations
-- Fix any errors or suboptimal designs found
-- Ensure syntactically correct and synthesizable Verilog
-- Implement complete functionality as specified
+    def _cached_generate_response(self, prompt: str, system_role: str) -> Optional[str]:
+        """generate_response with the optional on-disk cache in front"""
+        cached = self._llm_cache_get(prompt, system_role)
+        if cached is not None:
+            return cached
 
-CRITICAL OUTPUT FORMAT:
-1. Module name should be: {module_name}
-2. Output ONLY the module code
-3. Start with: module {module_name}
-4. End with: endmodule
-5. NO markdown formatting (no ```)
-6. NO explanations or text outside the module
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire()
+        response = self.llm.generate_response(prompt, system_role)
+        self._llm_cache_put(prompt, system_role, response)
+        return response
+
+    def _generate_hdl_response(self, prompt: str, system_role: str) -> Optional[str]:
+        """
+        Generate an HDL response, streaming when the backend supports it
+
+        HDL outputs end at 'endmodule', so with a streaming backend
+        (OllamaInterface) the request is aborted as soon as that marker
+        arrives instead of decoding the full num_predict budget. Falls back
+        to the blocking generate_response otherwise (e.g. OpenAIInterface).
+        Responses are served from / stored in the optional LLM cache.
+        """
+        cached = self._llm_cache_get(prompt, system_role)
+        if cached is not None:
+            return cached
+
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire()
+        stream = getattr(self.llm, "generate_stream", None)
+        if stream is None:
+            response = self.llm.generate_response(prompt, system_role)
+        else:
+            chunks = []
+            tail = ""
+            try:
+                for chunk in stream(prompt, system_role):
+                    chunks.append(chunk)
+                    # Rolling tail catches a marker split across chunk boundaries
+                    tail = (tail + chunk.lower())[-64:]
+                    if "endmodule" in tail:
+                        break
+                response = "".join(chunks).strip() or None
+            except Exception:
+                # Streaming endpoint unavailable - use the blocking path
+                response = self.llm.generate_response(prompt, system_role)
+
+        self._llm_cache_put(prompt, system_role, response)
+        return response
+
+    def _generate_intermediate_response(self, prompt: str) -> Optional[str]:
+        """
+        Generate a C++/Python intermediate response with streaming early-abort
+
+        Intermediate code is fenced, so once the closing ``` of the first
+        block arrives any trailing explanation is waste - the stream is
+        aborted there. Falls back to the blocking path when the backend has
+        no streaming support, and shares the optional LLM cache.
+        """
+        system_role = self.system_prompt_intermediate
+        cached = self._llm_cache_get(prompt, system_role)
+        if cached is not None:
+            return cached
+
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire()
+        stream = getattr(self.llm, "generate_stream", None)
+        if stream is None:
+            response = self.llm.generate_response(prompt, system_role)
+        else:
+            chunks = []
+            tail = ""
+            fence_count = 0
+            try:
+                for chunk in stream(prompt, system_role):
+                    chunks.append(chunk)
+                    # Count fences in (2-char tail + chunk) so a marker split
+                    # across chunk boundaries is still seen exactly once
+                    fence_count += (tail + chunk).count("```")
+                    tail = chunk[-2:]
+                    if fence_count >= 2:
+                        break
+                response = "".join(chunks).strip() or None
+            except Exception:
+                response = self.llm.generate_response(prompt, system_role)
+
+        self._llm_cache_put(prompt, system_role, response)
+        return response
 
-Output the synthesized Verilog module:"""
-    
     def generate_path_direct(self, description: str, previous_hdl: List[Dict] = None) -> Optional[str]:
         """Direct path: generate HDL directly"""
-        
+
         if previous_hdl:
             # Aggregation mode
             prompt = self.generate_aggregation_prompt(previous_hdl, description)
         else:
             # Initial generation
             prompt = self.generate_initial_prompt(description)
-        
-        response = self.llm.generate_response(prompt, self.system_prompt_direct)
-        
+
+        response = self._generate_hdl_response(prompt, self.system_prompt_direct)
+
         if response:
             return self.extract_code(response)
-        
+
         return None
     
     def generate_path_cpp_chain(self, description: str, 
@@ -831,14 +1318,17 @@ Previous HDL implementations:
 
 Write simple C++ code showing the algorithm:"""
             else:
-                cpp_prompt = f"""Write C++ code demonstrating the functional logic.
+                cpp_prompt = self._prompt_cache.get(("cpp_initial", description))
+                if cpp_prompt is None:
+                    cpp_prompt = f"""Write C++ code demonstrating the functional logic.
 
 Specification:
 {description}
 
 Write simple C++ code showing the algorithm:"""
+                    self._prompt_cache[("cpp_initial", description)] = cpp_prompt
             
-            cpp_response = self.llm.generate_response(cpp_prompt, self.system_prompt_intermediate)
+            cpp_response = self._generate_intermediate_response(cpp_prompt)
             
             if not cpp_response:
                 return None, None
@@ -858,7 +1348,7 @@ C++ reference code:
 
 Generate the {self.language} module implementing this logic:"""
         
-        hdl_response = self.llm.generate_response(hdl_prompt, self.system_prompt_translate)
+        hdl_response = self._generate_hdl_response(hdl_prompt, self.system_prompt_translate)
         
         if hdl_response:
             hdl_code = self.extract_code(hdl_response)
@@ -893,14 +1383,17 @@ Previous HDL implementations:
 
 Write simple Python code showing the algorithm:"""
             else:
-                py_prompt = f"""Write Python code demonstrating the functional logic.
+                py_prompt = self._prompt_cache.get(("py_initial", description))
+                if py_prompt is None:
+                    py_prompt = f"""Write Python code demonstrating the functional logic.
 
 Specification:
 {description}
 
 Write simple Python code showing the algorithm:"""
+                    self._prompt_cache[("py_initial", description)] = py_prompt
             
-            py_response = self.llm.generate_response(py_prompt, self.system_prompt_intermediate)
+            py_response = self._generate_intermediate_response(py_prompt)
             
             if not py_response:
                 return None, None
@@ -920,7 +1413,7 @@ Python reference code:
 
 Generate the {self.language} module implementing this logic:"""
         
-        hdl_response = self.llm.generate_response(hdl_prompt, self.system_prompt_translate)
+        hdl_response = self._generate_hdl_response(hdl_prompt, self.system_prompt_translate)
         
         if hdl_response:
             hdl_code = self.extract_code(hdl_response)
@@ -933,8 +1426,8 @@ Generate the {self.language} module implementing this logic:"""
                             reference_cpp: Optional[str] = None,
                             reference_python: Optional[str] = None) -> Optional[Dict]:
         """
-        Generate HDL via a single path with optional self-refinement
-        
+        Generate an unevaluated HDL candidate via a single path
+
         Args:
             path_type: 'direct', 'cpp', or 'python'
             description: Design specification
@@ -942,9 +1435,11 @@ Generate the {self.language} module implementing this logic:"""
             previous_hdl: Previous layer HDL codes
             reference_cpp: Reference C++ code (if available)
             reference_python: Reference Python code (if available)
-        
+
         Returns:
-            Dict with HDL code, quality score, path type, optional intermediate code, and original_quality
+            Dict with HDL code, path type and optional intermediate code.
+            Quality scoring and self-refinement happen at the layer level so
+            independent candidates can be evaluated as a batch.
         """
         hdl_code = None
         intermediate_code = None
@@ -971,39 +1466,137 @@ Generate the {self.language} module implementing this logic:"""
         else:
             raise ValueError(f"Unknown path type: {path_type}")
         
-        # Validate and evaluate HDL code
+        # Validate HDL code
         if hdl_code and self.validate_hdl_code(hdl_code):
-            # Apply self-refinement if enabled
-            if self.enable_self_refinement and self.enable_quality_caching:
-                hdl_code, quality, refine_iters, original_quality = self.refine_hdl_code(
-                    hdl_code, design_name, description, intermediate_code, intermediate_language
-                )
-            else:
-                quality = 0.0
-                original_quality = 0.0
-                if self.enable_quality_caching:
-                    quality = self.quality_evaluator.evaluate_quality(hdl_code, design_name)
-                    original_quality = quality
-            
             result = {
                 "code": hdl_code,
-                "quality_score": quality,
-                "original_quality": original_quality,  # For intermediate code evaluation
                 "path": f"{path_type}_chain" if path_type != 'direct' else 'direct',
                 "model": self.model,
                 "intermediate": None
             }
-            
+
             # Add intermediate code if available
             if intermediate_code and intermediate_language:
                 result["intermediate"] = {
                     "language": intermediate_language,
                     "code": intermediate_code
                 }
-            
+
             return result
-        
+
         return None
+
+    def generate_multipath_batched(self, description: str,
+                                   previous_codes: List[Dict] = None) -> Optional[List[Dict]]:
+        """
+        Generate all configured paths with a single JSON LLM call
+
+        The shared specification and previous-code context are sent once
+        instead of once per path, collapsing len(path_config) round-trips
+        and prefill passes into one. Duplicate path types collapse to one
+        entry (a single call cannot produce independent samples) and cached
+        intermediate references are not used in this mode.
+
+        Returns candidates in the generate_single_path result shape, or None
+        when the response cannot be parsed - the caller then falls back to
+        per-path generation.
+        """
+        requested_paths = list(dict.fromkeys(self.path_config))
+
+        schema_parts = []
+        for path_type in requested_paths:
+            if path_type == 'direct':
+                schema_parts.append(f'"direct": {{"hdl": "<complete {self.language} module>"}}')
+            else:
+                lang_label = "C++" if path_type == 'cpp' else "Python"
+                schema_parts.append(
+                    f'"{path_type}": {{"intermediate": "<{lang_label} reference code>", '
+                    f'"hdl": "<complete {self.language} module>"}}'
+                )
+        schema = "{" + ", ".join(schema_parts) + "}"
+
+        context = ""
+        if previous_codes:
+            context = "\n\nPrevious implementations to improve upon:\n" + "\n\n".join(
+                f"[quality: {entry.get('quality_score', 0):.2f}]\n{entry['code'][:800]}"
+                for entry in previous_codes[:2]
+            )
+
+        prompt = f"""Generate {self.language} implementations via the requested strategies and return ONLY a JSON object.
+
+Strategies: {', '.join(requested_paths)}
+
+JSON format (no markdown, no text outside the object):
+{schema}
+
+Each "hdl" value must be one complete module ending with endmodule.
+
+Specification:
+{description}{context}
+
+Return the JSON object now:"""
+
+        response = self._cached_generate_response(prompt, self.system_prompt_direct)
+        if not response:
+            return None
+
+        try:
+            start = response.index('{')
+            end = response.rindex('}') + 1
+            parsed = json.loads(response[start:end])
+        except (ValueError, json.JSONDecodeError):
+            return None
+
+        if not isinstance(parsed, dict):
+            return None
+
+        candidates = []
+        for path_type in requested_paths:
+            entry = parsed.get(path_type)
+            if not isinstance(entry, dict):
+                continue
+
+            hdl_code = entry.get("hdl")
+            if not isinstance(hdl_code, str):
+                continue
+            if not self.validate_hdl_code(hdl_code):
+                hdl_code = self.extract_code(hdl_code)
+                if not hdl_code or not self.validate_hdl_code(hdl_code):
+                    continue
+
+            candidate = {
+                "code": hdl_code,
+                "path": f"{path_type}_chain" if path_type != 'direct' else 'direct',
+                "model": self.model,
+                "intermediate": None
+            }
+            intermediate = entry.get("intermediate")
+            if path_type != 'direct' and isinstance(intermediate, str) and intermediate.strip():
+                candidate["intermediate"] = {
+                    "language": path_type,
+                    "code": intermediate
+                }
+            candidates.append(candidate)
+
+        return candidates or None
+
+    def _evaluate_candidates(self, codes: List[str], design_name: str) -> List[Tuple[float, Dict]]:
+        """
+        Evaluate candidate HDL codes, fanning batches out to the process pool
+
+        Single candidates skip the pool to avoid pickling overhead; a broken
+        pool falls back to in-process evaluation.
+        """
+        if self._eval_pool is None or len(codes) == 1:
+            return [self.quality_evaluator.evaluate_quality_with_details(code, design_name)
+                    for code in codes]
+
+        args = [(str(self.dataset_dir), self.dataset, code, design_name) for code in codes]
+        try:
+            return list(self._eval_pool.map(_eval_worker, args))
+        except Exception:
+            return [self.quality_evaluator.evaluate_quality_with_details(code, design_name)
+                    for code in codes]
     
     def generate_multipath_layer(self, description: str, layer_idx: int,
                                  design_name: str, cache_manager: Optional[DualLayerCacheManager] = None,
@@ -1029,20 +1622,126 @@ Generate the {self.language} module implementing this logic:"""
             if best_python:
                 reference_python = best_python["code"]
         
-        # Generate HDL for each configured path
-        for path_type in self.path_config:
-            result = self.generate_single_path(
-                path_type=path_type,
-                description=description,
-                design_name=design_name,
-                previous_hdl=previous_codes,
-                reference_cpp=reference_cpp,
-                reference_python=reference_python
-            )
-            
-            if result:
-                layer_outputs.append(result)
-        
+        # Optional batched mode: all paths from one JSON call, with per-path
+        # generation as the fallback when parsing fails
+        if self.enable_batched_paths:
+            batched = self.generate_multipath_batched(description, previous_codes)
+            if batched:
+                layer_outputs = batched
+
+        eval_futures = {}
+        if not layer_outputs:
+            # Generate HDL for all configured paths concurrently - each path
+            # blocks on its own LLM round-trip, so one worker per path
+            # collapses layer latency to roughly the slowest call instead of
+            # the sum. The pool is created once in __init__ and reused across
+            # layers and trials.
+            futures = [
+                self._path_pool.submit(
+                    self.generate_single_path,
+                    path_type=path_type,
+                    description=description,
+                    design_name=design_name,
+                    previous_hdl=previous_codes,
+                    reference_cpp=reference_cpp,
+                    reference_python=reference_python
+                )
+                for path_type in self.path_config
+            ]
+
+            # Grade each path's HDL the moment it arrives so the iverilog/vvp
+            # runs overlap the remaining LLM waits instead of queueing up
+            # after the slowest path has returned
+            eager_eval = self.enable_quality_caching and self._eval_pool is not None
+            results_by_future = {}
+            for future in as_completed(futures):
+                result = future.result()
+                results_by_future[future] = result
+                if result and eager_eval:
+                    key = HDLQualityEvaluator._cache_key(result["code"])
+                    if key not in eval_futures:
+                        try:
+                            eval_futures[key] = self._eval_pool.submit(
+                                _eval_worker,
+                                (str(self.dataset_dir), self.dataset,
+                                 result["code"], design_name)
+                            )
+                        except Exception:
+                            # Broken pool - fall back to batch evaluation below
+                            eval_futures.clear()
+                            eager_eval = False
+
+            # Collect in submission order so outputs stay ordered by path_config
+            for future in futures:
+                result = results_by_future[future]
+                if result:
+                    layer_outputs.append(result)
+
+        # Collapse whitespace-equivalent duplicates - low-T paths often emit
+        # identical code, and every copy would cost an iverilog evaluation
+        # and aggregation prompt space
+        seen_keys = set()
+        unique_outputs = []
+        for output in layer_outputs:
+            key = HDLQualityEvaluator._cache_key(output["code"])
+            if key in seen_keys:
+                continue
+            seen_keys.add(key)
+            unique_outputs.append(output)
+        layer_outputs = unique_outputs
+
+        # Score all candidates of the layer - eagerly-submitted evaluations
+        # are usually finished (or nearly so) by now; otherwise fan the batch
+        # out to the process pool, where the iverilog/vvp runs are
+        # independent and parallel across cores
+        if self.enable_quality_caching and layer_outputs:
+            if eval_futures:
+                try:
+                    evaluations = [
+                        eval_futures[HDLQualityEvaluator._cache_key(output["code"])].result()
+                        for output in layer_outputs
+                    ]
+                except Exception:
+                    evaluations = self._evaluate_candidates(
+                        [output["code"] for output in layer_outputs], design_name
+                    )
+            else:
+                evaluations = self._evaluate_candidates(
+                    [output["code"] for output in layer_outputs], design_name
+                )
+
+            perfect_found = False
+            for output, (quality, error_details) in zip(layer_outputs, evaluations):
+                if perfect_found:
+                    # A perfect candidate already ends the trial - keep the
+                    # batch score but skip further refinement work
+                    output["quality_score"] = quality
+                    output["original_quality"] = quality
+                    continue
+
+                if self.enable_self_refinement and not error_details["passed"]:
+                    intermediate = output.get("intermediate") or {}
+                    code, quality, refine_iters, original_quality = self.refine_hdl_code(
+                        output["code"], design_name, description,
+                        intermediate.get("code"), intermediate.get("language"),
+                        prior_eval=(quality, error_details)
+                    )
+                    output["code"] = code
+                    output["quality_score"] = quality
+                    output["original_quality"] = original_quality
+                else:
+                    output["quality_score"] = quality
+                    output["original_quality"] = quality
+
+                # Short-circuit the rest of the layer; generate_trial stops
+                # the remaining layers once it sees the perfect score
+                if self.enable_early_stopping and output["quality_score"] >= 1.0 - 1e-9:
+                    perfect_found = True
+        else:
+            for output in layer_outputs:
+                output["quality_score"] = 0.0
+                output["original_quality"] = 0.0
+
         return layer_outputs
     
     def generate_trial(self, description: str, trial_num: int, design_name: str) -> Optional[str]:
@@ -1058,128 +1757,149 @@ Generate the {self.language} module implementing this logic:"""
         if self.enable_quality_caching:
             cache_manager = DualLayerCacheManager(self.cache_dir, design_name, trial_num)
         
-        current_layer_outputs = []
-        
-        # Early stopping tracking
-        perfect_code_found = None
-        early_stop_layer = None
-        
-        # Process each layer
-        for layer_idx in range(self.num_layers):
-            print(f"L{layer_idx+1}[", end="", flush=True)
+        try:
+            current_layer_outputs = []
+        
+            # Early stopping tracking
+            perfect_code_found = None
+            early_stop_layer = None
+        
+            # Process each layer
+            for layer_idx in range(self.num_layers):
+                # The cache's running best may already be perfect (e.g. a
+                # refined code from an earlier layer) - don't launch more paths
+                if (self.enable_early_stopping and cache_manager
+                        and perfect_code_found is None and layer_idx > 0):
+                    top = cache_manager.get_top_quality_codes(1)
+                    if top and top[0]["quality_score"] == 1.0:
+                        print(f"[PERFECT@cache] EARLY_STOP")
+                        return top[0]["code"]
+
+                print(f"L{layer_idx+1}[", end="", flush=True)
             
-            if layer_idx == 0:
-                previous_codes = None
-            else:
-                if self.enable_quality_caching:
-                    previous_codes = cache_manager.get_top_quality_codes(
-                        self.n_select, up_to_layer=layer_idx-1
-                    )
+                if layer_idx == 0:
+                    previous_codes = None
                 else:
-                    if current_layer_outputs:
-                        sorted_codes = sorted(
-                            current_layer_outputs,
-                            key=lambda x: x.get("quality_score", 0),
-                            reverse=True
+                    if self.enable_quality_caching:
+                        previous_codes = cache_manager.get_top_quality_codes(
+                            self.n_select, up_to_layer=layer_idx-1
                         )
-                        previous_codes = sorted_codes[:self.n_select]
                     else:
-                        previous_codes = None
+                        if current_layer_outputs:
+                            sorted_codes = sorted(
+                                current_layer_outputs,
+                                key=lambda x: x.get("quality_score", 0),
+                                reverse=True
+                            )
+                            previous_codes = sorted_codes[:self.n_select]
+                        else:
+                            previous_codes = None
             
-            current_layer_outputs = self.generate_multipath_layer(
-                description, layer_idx, design_name, cache_manager, previous_codes
-            )
+                current_layer_outputs = self.generate_multipath_layer(
+                    description, layer_idx, design_name, cache_manager, previous_codes
+                )
             
-            print(f"]({len(current_layer_outputs)})", end="", flush=True)
+                print(f"]({len(current_layer_outputs)})", end="", flush=True)
             
-            if self.enable_quality_caching and current_layer_outputs:
-                cache_manager.add_layer_outputs_with_intermediate(layer_idx, current_layer_outputs)
+                if self.enable_quality_caching and current_layer_outputs:
+                    cache_manager.add_layer_outputs_with_intermediate(layer_idx, current_layer_outputs)
                 
-                # Check for perfect code (early stopping)
-                if self.enable_early_stopping and perfect_code_found is None:
-                    for output in current_layer_outputs:
-                        if output["quality_score"] == 1.0:
-                            perfect_code_found = output["code"]
-                            early_stop_layer = layer_idx
-                            print(f"[PERFECT@L{layer_idx+1}]", end="", flush=True)
-                            break
+                    # Check for perfect code (early stopping)
+                    if self.enable_early_stopping and perfect_code_found is None:
+                        for output in current_layer_outputs:
+                            if output["quality_score"] == 1.0:
+                                perfect_code_found = output["code"]
+                                early_stop_layer = layer_idx
+                                print(f"[PERFECT@L{layer_idx+1}]", end="", flush=True)
+                                break
                     
-                    # Early stopping - terminate if perfect code found
-                    if perfect_code_found is not None:
-                        print(" EARLY_STOP")
-                        return perfect_code_found
+                        # Early stopping - terminate if perfect code found
+                        if perfect_code_found is not None:
+                            print(" EARLY_STOP")
+                            return perfect_code_found
         
-        # Final aggregation phase
-        print(" AGG", end="", flush=True)
+            # Final aggregation phase
+            print(" AGG", end="", flush=True)
         
-        if self.enable_quality_caching and cache_manager:
-            # Get top-n codes for final aggregation
-            final_input = cache_manager.get_top_quality_codes(self.n_select)
-            
-            if final_input:
-                # Generate final aggregation prompt (no intermediate code)
-                final_prompt = self.generate_aggregation_prompt(
-                    final_input, description, intermediate_code=None
-                )
+            if self.enable_quality_caching and cache_manager:
+                # Get top-n codes for final aggregation
+                final_input = cache_manager.get_top_quality_codes(self.n_select)
+
+                # With a perfect code cached, the aggregation LLM call is pure
+                # overhead - the fallback would return this code anyway
+                if final_input and final_input[0]["quality_score"] == 1.0:
+                    print(" OK(perfect)")
+                    return final_input[0]["code"]
+
+                if final_input:
+                    # Generate final aggregation prompt (no intermediate code)
+                    final_prompt = self.generate_aggregation_prompt(
+                        final_input, description, intermediate_code=None
+                    )
                 
-                # LLM performs final aggregation
-                for attempt in range(2):
-                    if attempt > 0:
-                        final_prompt += "\n\nCRITICAL: Output ONLY the module code! No markdown, no explanations!"
-                        if self.dataset == "verilogeval":
-                            final_prompt += " Module name MUST be 'TopModule'!"
+                    # LLM performs final aggregation
+                    for attempt in range(2):
+                        if attempt > 0:
+                            final_prompt += "\n\nCRITICAL: Output ONLY the module code! No markdown, no explanations!"
+                            if self.dataset == "verilogeval":
+                                final_prompt += " Module name MUST be 'TopModule'!"
                     
-                    response = self.llm.generate_response(final_prompt, self.system_prompt_direct)
+                        response = self._generate_hdl_response(final_prompt, self.system_prompt_direct)
                     
-                    if response:
-                        final_code = self.extract_code(response)
-                        if final_code and self.validate_hdl_code(final_code):
-                            # Apply self-refinement to final code
-                            if self.enable_self_refinement:
-                                final_code, final_quality, refine_iters, _ = self.refine_hdl_code(
-                                    final_code, design_name, description
-                                )
-                                if refine_iters > 0:
-                                    print(f"[R{refine_iters}]", end="", flush=True)
-                            print(" OK")
-                            return final_code
+                        if response:
+                            final_code = self.extract_code(response)
+                            if final_code and self.validate_hdl_code(final_code):
+                                # Apply self-refinement to final code
+                                if self.enable_self_refinement:
+                                    final_code, final_quality, refine_iters, _ = self.refine_hdl_code(
+                                        final_code, design_name, description
+                                    )
+                                    if refine_iters > 0:
+                                        print(f"[R{refine_iters}]", end="", flush=True)
+                                print(" OK")
+                                return final_code
                 
-                # Fallback
-                print(" OK(best)")
-                return final_input[0]["code"]
-        
-        elif current_layer_outputs:
-            sorted_outputs = sorted(
-                current_layer_outputs,
-                key=lambda x: x.get("quality_score", 0),
-                reverse=True
-            )
-            top_outputs = sorted_outputs[:min(self.n_select, len(sorted_outputs))]
-            
-            if len(top_outputs) > 1:
-                # No intermediate code in final aggregation
-                final_prompt = self.generate_aggregation_prompt(
-                    top_outputs, description, intermediate_code=None
+                    # Fallback
+                    print(" OK(best)")
+                    return final_input[0]["code"]
+        
+            elif current_layer_outputs:
+                sorted_outputs = sorted(
+                    current_layer_outputs,
+                    key=lambda x: x.get("quality_score", 0),
+                    reverse=True
                 )
+                top_outputs = sorted_outputs[:min(self.n_select, len(sorted_outputs))]
+            
+                if len(top_outputs) > 1:
+                    # No intermediate code in final aggregation
+                    final_prompt = self.generate_aggregation_prompt(
+                        top_outputs, description, intermediate_code=None
+                    )
                 
-                for attempt in range(2):
-                    if attempt > 0:
-                        final_prompt += "\n\nCRITICAL: Output ONLY the module code!"
+                    for attempt in range(2):
+                        if attempt > 0:
+                            final_prompt += "\n\nCRITICAL: Output ONLY the module code!"
                     
-                    response = self.llm.generate_response(final_prompt, self.system_prompt_direct)
+                        response = self._generate_hdl_response(final_prompt, self.system_prompt_direct)
                     
-                    if response:
-                        final_code = self.extract_code(response)
-                        if final_code and self.validate_hdl_code(final_code):
-                            print(" OK")
-                            return final_code
+                        if response:
+                            final_code = self.extract_code(response)
+                            if final_code and self.validate_hdl_code(final_code):
+                                print(" OK")
+                                return final_code
             
-            if top_outputs:
-                print(" OK(best)")
-                return top_outputs[0]["code"]
+                if top_outputs:
+                    print(" OK(best)")
+                    return top_outputs[0]["code"]
         
-        print(" FAIL")
-        return None
+            print(" FAIL")
+            return None
+        finally:
+            # Flush the journaled cache to a full snapshot regardless of
+            # which exit path the trial took
+            if cache_manager:
+                cache_manager.finalize()
     
     def generate_design_trials(self, design: Dict) -> Dict:
         """Generate all trials for a design"""
@@ -1207,7 +1927,8 @@ Generate the {self.language} module implementing this logic:"""
             code = self.generate_trial(description, trial_num, design_name)
             
             if code:
-                trial_file = self.verilog_dir / f"t{trial_num}" / f"{design_name}{self.file_extension}"
+                trial_file = os.path.join(self._trial_dirs[trial_num],
+                                          f"{design_name}{self.file_extension}")
                 try:
                     with open(trial_file, 'w', encoding='utf-8') as f:
                         f.write(code)
@@ -1229,9 +1950,7 @@ Generate the {self.language} module implementing this logic:"""
                     "error": "Generation failed",
                     "success": False
                 })
-            
-            time.sleep(0.5)
-        
+
         return {
             "design": design_name,
             "trials": trials,
@@ -1239,8 +1958,18 @@ Generate the {self.language} module implementing this logic:"""
             "total_trials": Config.N_SAMPLES
         }
     
-    def run_generation(self, designs: List[Dict]):
-        """Run MoA-HLS generation for all designs"""
+    def run_generation(self, designs: List[Dict], max_concurrency: int = 1):
+        """
+        Run MoA-HLS generation for all designs
+
+        Args:
+            designs: Designs to generate (each fully independent: own cache
+                     manager, own output files)
+            max_concurrency: Number of designs processed concurrently.
+                             1 (default) keeps the original serial behavior;
+                             higher values overlap LLM latency across designs
+                             up to provider rate limits.
+        """
         print("MoA-HLS: Multi-path HDL Generation with Configurable Agents")
         print(f"Dataset: {self.dataset} ({self.language})")
         print(f"Model: {self.model}")
@@ -1268,15 +1997,48 @@ Generate the {self.language} module implementing this logic:"""
         
         print("=" * 70)
         
-        results = []
         total_successful = 0
-        
-        for i, design in enumerate(designs, 1):
-            print(f"[{i}/{len(designs)}] ", end="")
-            result = self.generate_design_trials(design)
-            results.append(result)
-            total_successful += result.get("successful_count", 0)
-            time.sleep(1)
+
+        # Per-design records stream to an NDJSON sidecar as they complete,
+        # so memory stays flat in the number of designs and a crash keeps
+        # every finished record; the summary below holds only aggregates
+        details_path = self.verilog_dir / "generation_summary.ndjson"
+        with open(details_path, 'wb') as details_file:
+
+            def record(result: Dict):
+                nonlocal total_successful
+                if orjson is not None:
+                    details_file.write(orjson.dumps(result))
+                else:
+                    details_file.write(json.dumps(result).encode('utf-8'))
+                details_file.write(b'\n')
+                total_successful += result.get("successful_count", 0)
+
+            if max_concurrency <= 1:
+                for i, design in enumerate(designs, 1):
+                    print(f"[{i}/{len(designs)}] ", end="")
+                    record(self.generate_design_trials(design))
+            else:
+                # Designs are independent, so overlap their LLM waits with a
+                # bounded pool (progress prints will interleave across designs)
+                with ThreadPoolExecutor(max_workers=max_concurrency) as design_pool:
+                    futures = [
+                        design_pool.submit(self.generate_design_trials, design)
+                        for design in designs
+                    ]
+                    for i, future in enumerate(futures, 1):
+                        try:
+                            result = future.result()
+                        except Exception as e:
+                            result = {
+                                "design": designs[i - 1].get("name", "unknown"),
+                                "error": f"Generation crashed: {e}",
+                                "trials": [],
+                                "successful_count": 0
+                            }
+                        print(f"[{i}/{len(designs)}] {result['design']}: "
+                              f"{result.get('successful_count', 0)} successful")
+                        record(result)
         
         # Save generation summary
         summary = {
@@ -1299,11 +2061,15 @@ Generate the {self.language} module implementing this logic:"""
             "total_trials": len(designs) * Config.N_SAMPLES,
             "successful_trials": total_successful,
             "success_rate": f"{total_successful/(len(designs)*Config.N_SAMPLES)*100:.1f}%",
-            "details": results
+            "details_file": details_path.name
         }
         
-        with open(self.verilog_dir / "generation_summary.json", 'w', encoding='utf-8') as f:
-            json.dump(summary, f, indent=2)
+        if orjson is not None:
+            with open(self.verilog_dir / "generation_summary.json", 'wb') as f:
+                f.write(orjson.dumps(summary, option=orjson.OPT_INDENT_2))
+        else:
+            with open(self.verilog_dir / "generation_summary.json", 'w', encoding='utf-8') as f:
+                json.dump(summary, f, indent=2)
         
         print(f"\nGeneration complete: {total_successful}/{len(designs)*Config.N_SAMPLES} successful")
         print(f"Output: {self.verilog_dir}")
@@ -1311,8 +2077,12 @@ Generate the {self.language} module implementing this logic:"""
         if self.enable_quality_caching:
             # Generate cache analysis
             cache_analysis = self.global_cache_manager.generate_global_analysis()
-            with open(self.cache_dir / "cache_analysis.json", 'w', encoding='utf-8') as f:
-                json.dump(cache_analysis, f, indent=2)
+            if orjson is not None:
+                with open(self.cache_dir / "cache_analysis.json", 'wb') as f:
+                    f.write(orjson.dumps(cache_analysis, option=orjson.OPT_INDENT_2))
+            else:
+                with open(self.cache_dir / "cache_analysis.json", 'w', encoding='utf-8') as f:
+                    json.dump(cache_analysis, f, indent=2)
             print(f"Cache analysis: {self.cache_dir / 'cache_analysis.json'}")
         
         return self.verilog_dir, self.result_dir
@@ -1353,8 +2123,12 @@ def main():
     n_select = 3
     path_config = None  # Will use default ['direct', 'cpp', 'python']
     enable_early_stopping = True
-    enable_self_refinement = True  
-    max_self_refinement_iterations = 3 
+    enable_self_refinement = True
+    max_self_refinement_iterations = 3
+    enable_llm_caching = False
+    enable_batched_paths = False
+    requests_per_minute = 0
+    max_concurrency = Config.MAX_CONCURRENT_DESIGNS
     
     # Parse command line arguments
     for arg in sys.argv[1:]:
@@ -1385,6 +2159,14 @@ def main():
             enable_self_refinement = False
         elif arg.startswith('--max_refine_iters='):
             max_self_refinement_iterations = int(arg.split('=')[1])
+        elif arg == '--llm_cache':
+            enable_llm_caching = True
+        elif arg == '--batch_paths':
+            enable_batched_paths = True
+        elif arg.startswith('--rpm='):
+            requests_per_minute = int(arg.split('=')[1])
+        elif arg.startswith('--concurrency='):
+            max_concurrency = int(arg.split('=')[1])
         elif arg == '--help':
             print("MoA-HLS: Multi-path HDL Generation with Configurable Agents")
             print("\nUsage: python MoA_HLS.py [options]")
@@ -1404,6 +2186,10 @@ def main():
             print("  --self_refine            Enable self-refinement (default: enabled)")
             print("  --no_self_refine         Disable self-refinement")
             print("  --max_refine_iters=<n>   Max refinement iterations (default: 3)")
+            print("  --llm_cache              Cache LLM responses on disk by prompt hash")
+            print("  --batch_paths            Request all paths in one JSON-mode LLM call")
+            print("  --rpm=<n>                API requests per minute quota (default: unlimited)")
+            print("  --concurrency=<n>        Designs generated concurrently (default: 1)")
             print("\nExample:")
             print("  python MoA_HLS.py --model=gpt-4o-mini --layers=3 --paths=cpp,cpp,cpp --self_refine --max_refine_iters=3")
             return
@@ -1427,11 +2213,14 @@ def main():
         path_config=path_config,
         enable_early_stopping=enable_early_stopping,
         enable_self_refinement=enable_self_refinement,
-        max_self_refinement_iterations=max_self_refinement_iterations
+        max_self_refinement_iterations=max_self_refinement_iterations,
+        enable_llm_caching=enable_llm_caching,
+        enable_batched_paths=enable_batched_paths,
+        requests_per_minute=requests_per_minute
     )
     
     # Run generation
-    verilog_dir, result_dir = generator.run_generation(designs)
+    verilog_dir, result_dir = generator.run_generation(designs, max_concurrency=max_concurrency)
     
     # Run testing
     print("\nStarting testing phase...")
@@ -7,25 +7,132 @@ NEW: Added early stopping feature to terminate generation when perfect HDL is fo
 NEW: Added self-refinement feature to iteratively fix HDL errors using iverilog feedback
 """
 
+import argparse
+import hashlib
 import json
+import threading
 import time
 import os
 import re
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from functools import lru_cache
 from pathlib import Path
 from typing import List, Dict, Optional, Tuple, Union
 from datetime import datetime
+
+try:
+    import orjson  # C-extension JSON, faster for the summary/analysis dumps
+except ImportError:
+    orjson = None
 from config import Config
 from llm_interface import create_llm_interface
 from hdl_tester_enhanced import MultiDatasetHDLTester
-from utils import load_designs
+from utils import load_designs, TokenBucket
 from quality_evaluator import HDLQualityEvaluator
 from cache_manager import HDLCacheManager, GlobalCacheManager
 
+# Precompiled patterns for extraction, cleanup and validation - these run on
+# every LLM response (every model, layer, trial and refinement iteration), so
+# the pattern parsing and re-cache lookups are hoisted out of the hot path
+_RX_CODEBLOCK = re.compile(r'```(?:systemverilog|verilog|sv|v)?\s*\n?', re.IGNORECASE)
+_RX_TRAILING_FENCE = re.compile(r'```\s*$', re.MULTILINE)
+_RX_FENCE_LINE = re.compile(r'```.*?$', re.MULTILINE)
+
+_RX_PREFIXES = [
+    re.compile(f'^{prefix}', re.IGNORECASE | re.MULTILINE)
+    for prefix in [
+        r"Here's the (?:System)?Verilog (?:code|module|implementation):?\s*",
+        r"Here is the (?:System)?Verilog (?:code|module|implementation):?\s*",
+        r"The (?:System)?Verilog (?:code|module) is:?\s*",
+        r"Output:?\s*", r"Solution:?\s*", r"Implementation:?\s*", r"Code:?\s*",
+        r"(?:System)?Verilog:?\s*", r"Generated (?:System)?Verilog module:?\s*", r"Module code:?\s*"
+    ]
+]
+
+_RX_TODO_INLINE = re.compile(r'//\s*(?:TODO|FIXME|NOTE|WARNING):', re.IGNORECASE)
+
+_RX_FIX_NAME = [
+    (re.compile(pattern, re.IGNORECASE | re.MULTILINE), replacement)
+    for pattern, replacement in [
+        (r'module\s+\w+(\s*#\s*\([^)]*\)\s*)?(\s*\([^)]*\))', r'module TopModule\1\2'),
+        (r'module\s+\w+(\s*\([^)]*\))', r'module TopModule\1'),
+        (r'module\s+\w+\s*;', r'module TopModule;'),
+        (r'module\s+\w+\s*$', r'module TopModule')
+    ]
+]
+
+_RX_MODULE_DECL = re.compile(r'module\s+\w+', re.IGNORECASE)
+_RX_MODULE_IDENT = re.compile(r'module\s+[a-zA-Z_][a-zA-Z0-9_]*')
+_RX_TOPMODULE = re.compile(r'module\s+TopModule')
+_RX_ENDMODULE_EOL = re.compile(r'endmodule\s*;?\s*$', re.MULTILINE | re.IGNORECASE)
+_RX_ENDMODULE_TAIL = re.compile(r'endmodule\s*;?\s*', re.IGNORECASE)
+_RX_MODULE_NAME = re.compile(r'Module name:\s*(\w+)')
+
+# Folder-name slug for model identifiers: one translate call instead of
+# chained str.replace allocations
+_SLUG_TABLE = str.maketrans({':': '-', '.': '_'})
+
+# Completed low_T responses kept for reuse across trials (FIFO-bounded)
+_RESPONSE_CACHE_MAX = 256
+
+
+@lru_cache(maxsize=1024)
+def _read_description(path: str) -> str:
+    """Read a design description file once per run
+
+    Descriptions never change during a sweep, so repeated trials and
+    re-instantiated generators hit the cache instead of the filesystem.
+    """
+    with open(path, 'rb') as f:
+        return f.read().decode('utf-8').strip()
+
+
+def _is_module_decl_line(stripped: str) -> bool:
+    """Plain-string equivalent of _RX_MODULE_DECL.match on a stripped line"""
+    if stripped[:6].lower() != 'module':
+        return False
+    rest = stripped[6:]
+    body = rest.lstrip()
+    if not body or len(body) == len(rest):
+        return False
+    first = body[0]
+    return first.isalnum() or first == '_'
+
+
+def _is_endmodule_line(stripped: str) -> bool:
+    """True when a stripped line is just 'endmodule' plus optional ';'"""
+    if stripped[:9].lower() != 'endmodule':
+        return False
+    tail = stripped[9:].strip()
+    return tail in ('', ';')
+
+# Static aggregation-prompt fragments, selected once per generator instance
+_VE_AGG_FORMAT = """
+CRITICAL OUTPUT FORMAT:
+1. Output ONLY the module code
+2. Module name MUST be exactly 'TopModule'
+3. Start directly with: module TopModule
+4. End with: endmodule
+5. NO markdown formatting (no ```)
+6. NO explanations or text outside the module
+7. Synthesize the best solution from the given responses"""
+
+_RTLLM_AGG_FORMAT = """
+CRITICAL OUTPUT FORMAT:
+1. Output ONLY the module code
+2. Start directly with: module <name>
+3. End with: endmodule
+4. NO markdown formatting (no ```)
+5. NO explanations or text outside the module
+6. Synthesize the best solution from the given responses"""
+
+
 class EnhancedMoAHDLGenerator:
     def __init__(self, layer_models: List[str], aggregator_model: str, 
                  num_layers: int, dataset: str = "rtllm", temp_mode: str = "low_T", 
                  enable_quality_caching: bool = False, enable_early_stopping: bool = False,
-                 enable_self_refinement: bool = False, max_self_refinement_iterations: int = 3):
+                 enable_self_refinement: bool = False, max_self_refinement_iterations: int = 3,
+                 requests_per_minute: int = 0):
         """
         Initialize Enhanced MoA HDL Generator with optional quality-based caching, early stopping and self-refinement
         
@@ -39,6 +146,9 @@ class EnhancedMoAHDLGenerator:
             enable_early_stopping: True to stop generation when perfect HDL (score=1.0) is found
             enable_self_refinement: True to iteratively fix HDL errors using iverilog feedback
             max_self_refinement_iterations: Maximum refinement iterations (default: 3)
+            requests_per_minute: API request quota enforced via a token
+                bucket; 0 disables pacing (server-side queueing handles
+                backpressure)
         """
         self.layer_models = layer_models
         self.aggregator_model = aggregator_model
@@ -54,6 +164,51 @@ class EnhancedMoAHDLGenerator:
         
         # Quality-based caching parameters
         self.n_select = 3  # Number of top-quality codes to select for next layer input
+
+        # Memoized extraction/validation results keyed by input digest -
+        # identical strings recur whenever cached codes feed later layers
+        self._extract_cache = {}
+        self._validate_cache = {}
+
+        # Request coalescing, low_T only: generation is deterministic at
+        # temperature 0, so byte-identical prompts share one in-flight
+        # request and completed responses are reused across trials. At
+        # high_T every call is an independent sample and nothing is
+        # deduplicated, or layer diversity would collapse
+        self._inflight = {}
+        self._inflight_lock = threading.Lock()
+        self._response_cache = {}
+
+        # Consecutive failed calls per model; used as a cheap circuit
+        # breaker to stop spending format-reminder retries on a model
+        # that keeps failing (counter races between layer workers only
+        # delay the cutoff by one retry, which is acceptable)
+        self._model_failures = {}
+
+        # Optional request pacing: sleeps only when the quota is actually
+        # approached, never unconditionally between trials
+        if requests_per_minute > 0:
+            self.rate_limiter = TokenBucket(requests_per_minute / 60.0)
+        else:
+            self.rate_limiter = None
+
+        # Aggregation-prompt fragments and the extract/validate pipeline
+        # parameters are fixed per dataset; resolve the per-call
+        # "is this verilogeval?" branches once here
+        if dataset == "verilogeval":
+            self._agg_format_requirements = _VE_AGG_FORMAT
+            self._agg_language = "SystemVerilog"
+            self._fix_names = True
+            self._strip_all_comments = True
+            self._min_code_length = 30
+            self._name_rx = _RX_TOPMODULE
+        else:
+            self._agg_format_requirements = _RTLLM_AGG_FORMAT
+            self._agg_language = "Verilog"
+            self._fix_names = False
+            self._strip_all_comments = False
+            self._min_code_length = 25
+            self._name_rx = _RX_MODULE_IDENT
         
         # Dataset-specific paths
         dataset_dir = Config.VERILOGEVAL_DIR if dataset == "verilogeval" else Config.RTLLM_DIR
@@ -117,12 +272,34 @@ class EnhancedMoAHDLGenerator:
             
             # Apply MoA-specific parameters if defined
             if model in self.moa_llm_params:
-                base_params = Config.get_model_params(model, temp_mode)
-                base_params.update(self.moa_llm_params[model])
-                llm.params = base_params
+                # get_model_params returns a shared read-only mapping
+                llm.params = {**Config.get_model_params(model, temp_mode),
+                              **self.moa_llm_params[model]}
             
             self.llm_interfaces[model] = llm
-        
+
+        # Layer-generation pool shared by all trials and designs. Each call
+        # blocks on its own LLM round-trip, so fanning out collapses layer
+        # wall time to roughly the slowest model instead of the sum. Sized
+        # for the full fan-out (models x concurrent trials) so one trial's
+        # slow model never queues another trial's fast models behind it -
+        # the executor's shared task queue keeps every worker busy while
+        # any work is pending. Requires OLLAMA_NUM_PARALLEL sized to match
+        # on the server for local models to actually overlap.
+        layer_width = max(len(self.layer_models), 1)
+        self._layer_pool = ThreadPoolExecutor(
+            max_workers=layer_width * max(Config.N_SAMPLES, 1)
+        )
+
+        # Writer pool for trial output files: writes are submitted as soon
+        # as a trial produces code and only awaited when the design's
+        # results are assembled, so disk I/O overlaps remaining generation
+        self._write_pool = ThreadPoolExecutor(max_workers=8)
+
+        # Scorer pool: iverilog-based quality scoring for fast models runs
+        # here while slower models in the same layer are still generating
+        self._scorer_pool = ThreadPoolExecutor(max_workers=4)
+
         # Set file extension and language
         self.file_extension = Config.get_file_extension(dataset)
         self.language = "SystemVerilog" if dataset == "verilogeval" else "Verilog"
@@ -143,11 +320,11 @@ class EnhancedMoAHDLGenerator:
     def setup_directories(self):
         """Setup output directories with descriptive names"""
         if self.num_layers == 0:
-            aggregator_str = self.aggregator_model.replace(":", "-").replace(".", "_")
+            aggregator_str = self.aggregator_model.translate(_SLUG_TABLE)
             folder_name = f"Direct_{self.temp_mode}_{aggregator_str}"
         else:
-            models_str = "_".join([m.replace(":", "-").replace(".", "_") for m in self.layer_models])
-            aggregator_str = self.aggregator_model.replace(":", "-").replace(".", "_")
+            models_str = "_".join([m.translate(_SLUG_TABLE) for m in self.layer_models])
+            aggregator_str = self.aggregator_model.translate(_SLUG_TABLE)
             folder_name = f"MoA_{self.temp_mode}_L{self.num_layers}_{models_str}_AGG_{aggregator_str}"
             if self.enable_quality_caching:
                 folder_name += "_QualityCache"
@@ -165,9 +342,21 @@ class EnhancedMoAHDLGenerator:
         
         self.verilog_dir.mkdir(parents=True, exist_ok=True)
         self.result_dir.mkdir(parents=True, exist_ok=True)
-        
+
+        self._make_trial_dirs(self.verilog_dir)
+
+    @staticmethod
+    def _make_trial_dirs(base_dir: Path):
+        """Create t1..tN under base_dir, skipping ones that already exist
+
+        One scandir snapshot replaces a stat+mkdir syscall pair per trial;
+        with many generator instances per sweep this adds up.
+        """
+        existing = {entry.name for entry in os.scandir(base_dir)}
         for i in range(1, Config.N_SAMPLES + 1):
-            (self.verilog_dir / f"t{i}").mkdir(exist_ok=True)
+            name = f"t{i}"
+            if name not in existing:
+                (base_dir / name).mkdir()
     
     def setup_cache_directory(self):
         """Setup cache directory for intermediate HDL storage"""
@@ -177,11 +366,11 @@ class EnhancedMoAHDLGenerator:
             base_cache_dir = Path("./verilog_temp")
         
         if self.num_layers == 0:
-            aggregator_str = self.aggregator_model.replace(":", "-").replace(".", "_")
+            aggregator_str = self.aggregator_model.translate(_SLUG_TABLE)
             folder_name = f"Direct_{self.temp_mode}_{aggregator_str}_QualityCache"
         else:
-            models_str = "_".join([m.replace(":", "-").replace(".", "_") for m in self.layer_models])
-            aggregator_str = self.aggregator_model.replace(":", "-").replace(".", "_")
+            models_str = "_".join([m.translate(_SLUG_TABLE) for m in self.layer_models])
+            aggregator_str = self.aggregator_model.translate(_SLUG_TABLE)
             folder_name = f"MoA_{self.temp_mode}_L{self.num_layers}_{models_str}_AGG_{aggregator_str}_QualityCache"
             if self.enable_early_stopping:
                 folder_name += "_EarlyStop"
@@ -189,11 +378,9 @@ class EnhancedMoAHDLGenerator:
                 folder_name += f"_SelfRef{self.max_self_refinement_iterations}"
         
         self.cache_dir = base_cache_dir / "MoA" / folder_name
+        # GlobalCacheManager creates cache_dir itself, so it is safe to scan
         self.global_cache_manager = GlobalCacheManager(self.cache_dir)
-        
-        # Create trial directories in cache
-        for i in range(1, Config.N_SAMPLES + 1):
-            (self.cache_dir / f"t{i}").mkdir(parents=True, exist_ok=True)
+        self._make_trial_dirs(self.cache_dir)
     
     def setup_system_prompts(self):
         """Setup unified system prompts based on dataset and task type"""
@@ -237,7 +424,17 @@ class EnhancedMoAHDLGenerator:
                 "Focus on the specific error messages and fix ONLY what's broken. "
                 "Output clean, corrected code without explanations."
             )
-    
+
+        # Retry suffixes are constant per dataset; build them once here so
+        # retry prompts are a single concatenation at the call sites
+        topmodule_reminder = " Module name MUST be 'TopModule'!" if self.dataset == "verilogeval" else ""
+        self._retry_suffix_generate = (
+            "\n\nREMINDER: Output ONLY the code, no explanations!" + topmodule_reminder
+        )
+        self._retry_suffix_aggregate = (
+            "\n\nCRITICAL: Output ONLY the module code! No markdown, no explanations!" + topmodule_reminder
+        )
+
     def generate_refinement_prompt(self, original_code: str, error_type: str, 
                                    error_message: str, description: str, iteration: int) -> str:
         """
@@ -328,7 +525,7 @@ CRITICAL OUTPUT REQUIREMENTS:
 7. Include ALL necessary submodules in the SAME file if needed
 """
         else:  # rtllm
-            module_name_match = re.search(r'Module name:\s*(\w+)', description)
+            module_name_match = _RX_MODULE_NAME.search(description)
             module_name = module_name_match.group(1) if module_name_match else "module_name"
             
             output_requirements = f"""
@@ -393,8 +590,6 @@ Output the corrected {self.language} code now:"""
         best_quality = quality
         current_code = original_code
         
-        llm = self.llm_interfaces[model]
-        
         for iteration in range(1, self.max_self_refinement_iterations + 1):
             # Generate refinement prompt
             refinement_prompt = self.generate_refinement_prompt(
@@ -406,7 +601,7 @@ Output the corrected {self.language} code now:"""
             )
             
             # Get refined code from LLM
-            response = llm.generate_response(refinement_prompt, self.system_prompt_refinement)
+            response = self._call_llm(model, refinement_prompt, self.system_prompt_refinement)
             
             if not response:
                 break  # LLM failed to respond
@@ -456,7 +651,7 @@ Specification:
 
 Output the SystemVerilog module now:"""
         else:  # rtllm
-            module_name_match = re.search(r'Module name:\s*(\w+)', description)
+            module_name_match = _RX_MODULE_NAME.search(description)
             module_name = module_name_match.group(1) if module_name_match else "module_name"
             
             return f"""Generate Verilog code for this specification.
@@ -483,45 +678,21 @@ Output the Verilog module now:"""
             hdl_data: List of HDL strings (standard mode) or List of HDL dicts (quality mode)
             description: Original specification
         """
-        responses_text = ""
-        
-        # Handle different input types
+        # Quality caching mode passes dicts with quality info; standard mode
+        # passes plain strings. Build via list+join to avoid O(n^2) += growth.
+        parts = []
         if hdl_data and isinstance(hdl_data[0], dict):
-            # Quality caching mode: hdl_data contains dicts with quality info
-            for i, code_info in enumerate(hdl_data, 1):
-                code = code_info["code"]
-                if len(code) > 5000:
-                    code = code[:5000] + "\n... [truncated]"
-                responses_text += f"\n[Response {i}]\n{code}\n"
-        else:
-            # Standard mode: hdl_data contains plain strings
-            for i, code in enumerate(hdl_data, 1):
-                if len(code) > 5000:
-                    code = code[:5000] + "\n... [truncated]"
-                responses_text += f"\n[Response {i}]\n{code}\n"
-        
-        if self.dataset == "verilogeval":
-            format_requirements = """
-CRITICAL OUTPUT FORMAT:
-1. Output ONLY the module code
-2. Module name MUST be exactly 'TopModule'
-3. Start directly with: module TopModule
-4. End with: endmodule
-5. NO markdown formatting (no ```)
-6. NO explanations or text outside the module
-7. Synthesize the best solution from the given responses"""
-            language_spec = "SystemVerilog"
+            codes = (code_info["code"] for code_info in hdl_data)
         else:
-            format_requirements = """
-CRITICAL OUTPUT FORMAT:
-1. Output ONLY the module code
-2. Start directly with: module <name>
-3. End with: endmodule
-4. NO markdown formatting (no ```)
-5. NO explanations or text outside the module
-6. Synthesize the best solution from the given responses"""
-            language_spec = "Verilog"
-        
+            codes = iter(hdl_data)
+
+        for i, code in enumerate(codes, 1):
+            if len(code) > 5000:
+                code = code[:5000] + "\n... [truncated]"
+            parts.append(f"\n[Response {i}]\n{code}\n")
+        responses_text = ''.join(parts)
+
+        language_spec = self._agg_language
         return f"""Synthesize multiple {language_spec} implementations into one superior solution.
 
 Original specification:
@@ -536,213 +707,216 @@ Requirements:
 - Ensure syntactically correct {language_spec}
 - Implement all required functionality
 
-{format_requirements}
+{self._agg_format_requirements}
 
 Output the {language_spec} module now:"""
     
+    @staticmethod
+    def _memo_key(text: str) -> bytes:
+        """Compact digest used as extraction/validation memo key"""
+        return hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest()
+
     def extract_code(self, response: str) -> Optional[str]:
-        """Enhanced code extraction with multiple strategies"""
+        """
+        Enhanced code extraction with multiple strategies
+
+        Results are memoized per response hash: identical responses (reused
+        top-quality codes across layers, retried prompts, cached LLM output)
+        skip the whole regex pipeline on repeat calls.
+        """
         if not response:
             return None
-        
+
+        key = self._memo_key(response)
+        if key in self._extract_cache:
+            return self._extract_cache[key]
+
+        code = self._extract_code_impl(response)
+        self._extract_cache[key] = code
+        return code
+
+    def _extract_code_impl(self, response: str) -> Optional[str]:
         response = response.strip()
         
         # Remove markdown code blocks
-        response = re.sub(r'```(?:systemverilog|verilog|sv|v)?\s*\n?', '', response, flags=re.IGNORECASE)
-        response = re.sub(r'```\s*$', '', response, flags=re.MULTILINE)
+        response = _RX_CODEBLOCK.sub('', response)
+        response = _RX_TRAILING_FENCE.sub('', response)
         
         # Remove common prefixes
-        prefixes_to_remove = [
-            r"Here's the (?:System)?Verilog (?:code|module|implementation):?\s*",
-            r"Here is the (?:System)?Verilog (?:code|module|implementation):?\s*",
-            r"The (?:System)?Verilog (?:code|module) is:?\s*",
-            r"Output:?\s*", r"Solution:?\s*", r"Implementation:?\s*", r"Code:?\s*",
-            r"(?:System)?Verilog:?\s*", r"Generated (?:System)?Verilog module:?\s*", r"Module code:?\s*"
-        ]
-        
-        for prefix in prefixes_to_remove:
-            response = re.sub(f'^{prefix}', '', response, flags=re.IGNORECASE | re.MULTILINE)
-        
-        # Find module boundaries
-        module_patterns = [
-            r'\b(module\s+[a-zA-Z_][a-zA-Z0-9_]*.*?endmodule\s*;?)\b',
-            r'(module\s+\w+[^;]*?[\s\S]*?endmodule\s*;?)',
-            r'(module[\s\S]+?endmodule)'
-        ]
-        
-        for pattern in module_patterns:
-            matches = re.findall(pattern, response, re.DOTALL | re.IGNORECASE)
-            if matches:
-                code = matches[0]
-                code = self.clean_extracted_code(code)
-                
-                if self.dataset == "verilogeval":
-                    code = self.fix_module_name(code)
-                
-                if self.validate_extracted_code(code):
-                    return code.strip()
-        
-        # Fallback strategies
+        for prefix_rx in _RX_PREFIXES:
+            response = prefix_rx.sub('', response)
+        
+        # Find module boundaries with one linear scan: the first module
+        # declaration, then the first endmodule after it. Guaranteed O(n),
+        # unlike the previous lazy-quantifier pattern ladder whose
+        # backtracking went quadratic on long or malformed responses. A
+        # missing endmodule is appended, which also covers what the old
+        # salvage_module_code fallback did.
+        start = _RX_MODULE_DECL.search(response)
+        if start:
+            tail = response[start.start():]
+            end = _RX_ENDMODULE_TAIL.search(tail)
+            code = tail[:end.end()] if end else tail + '\nendmodule'
+            code = self.clean_extracted_code(code)
+
+            if self._fix_names:
+                code = self.fix_module_name(code)
+
+            if self.validate_extracted_code(code):
+                return code.strip()
+
+        # Fallback: line-oriented extraction handles fenced or interleaved text
         code = self.extract_code_by_lines(response)
         if code and self.validate_extracted_code(code):
             return code
-        
-        if 'module' in response.lower():
-            code = self.salvage_module_code(response)
-            if code and self.validate_extracted_code(code):
-                return code
-        
+
         return None
     
     def clean_extracted_code(self, code: str) -> str:
-        """Clean up extracted code"""
-        if self.dataset == "verilogeval":
-            code = re.sub(r'//.*?$', '', code, flags=re.MULTILINE)
-            code = re.sub(r'/\*.*?\*/', '', code, flags=re.DOTALL)
-        else:
-            code = re.sub(r'//\s*(TODO|FIXME|NOTE|WARNING):.*?$', '', code, flags=re.MULTILINE | re.IGNORECASE)
-        
-        code = re.sub(r'```.*?$', '', code, flags=re.MULTILINE)
-        
-        lines = code.split('\n')
+        """Clean up extracted code in a single pass over its lines"""
+        strip_all_comments = self._strip_all_comments
+
+        if strip_all_comments and '/*' in code:
+            # Splice out /* ... */ block comments with a find/find scan;
+            # an unterminated block is kept intact
+            parts = []
+            pos = 0
+            while True:
+                start = code.find('/*', pos)
+                if start < 0:
+                    parts.append(code[pos:])
+                    break
+                end = code.find('*/', start + 2)
+                if end < 0:
+                    parts.append(code[pos:])
+                    break
+                parts.append(code[pos:start])
+                pos = end + 2
+            code = ''.join(parts)
+
         cleaned_lines = []
         empty_line_count = 0
-        
-        for line in lines:
+
+        for line in code.split('\n'):
+            if '```' in line:
+                line = line[:line.index('```')]
+            if '//' in line:
+                if strip_all_comments:
+                    line = line[:line.index('//')]
+                else:
+                    m = _RX_TODO_INLINE.search(line)
+                    if m:
+                        line = line[:m.start()]
             if line.strip():
                 empty_line_count = 0
                 cleaned_lines.append(line)
             elif empty_line_count < 1:
                 empty_line_count += 1
                 cleaned_lines.append(line)
-        
+
         return '\n'.join(cleaned_lines)
     
     def fix_module_name(self, code: str) -> str:
         """Fix module name for VerilogEval (must be TopModule)"""
-        if self.dataset != "verilogeval":
+        if not self._fix_names:
             return code
         
-        replacements = [
-            (r'module\s+\w+(\s*#\s*\([^)]*\)\s*)?(\s*\([^)]*\))', r'module TopModule\1\2'),
-            (r'module\s+\w+(\s*\([^)]*\))', r'module TopModule\1'),
-            (r'module\s+\w+\s*;', r'module TopModule;'),
-            (r'module\s+\w+\s*$', r'module TopModule')
-        ]
-        
-        for pattern, replacement in replacements:
-            code = re.sub(pattern, replacement, code, count=1, flags=re.IGNORECASE | re.MULTILINE)
+        for pattern, replacement in _RX_FIX_NAME:
+            code = pattern.sub(replacement, code, count=1)
         
         return code
     
     def extract_code_by_lines(self, response: str) -> Optional[str]:
-        """Extract code by processing line by line"""
-        lines = response.split('\n')
+        """Extract code by processing line by line
+
+        The per-line checks use plain string operations instead of regex
+        matches; on long responses the scan is dominated by these two
+        tests, and str slicing/startswith stay in C.
+        """
         module_started = False
         code_lines = []
-        
-        for line in lines:
+
+        for line in response.split('\n'):
             stripped = line.strip()
-            
+
             if stripped.startswith('```'):
                 continue
-            
-            if not module_started and re.match(r'module\s+\w+', stripped, re.IGNORECASE):
+
+            if not module_started and _is_module_decl_line(stripped):
                 module_started = True
                 code_lines.append(line)
                 continue
-            
+
             if module_started:
                 code_lines.append(line)
-                
-                if re.match(r'endmodule\s*;?\s*$', stripped, re.IGNORECASE):
+
+                if _is_endmodule_line(stripped):
                     break
-                
+
                 if len(code_lines) > 1000:
                     break
         
         if code_lines:
             code = '\n'.join(code_lines)
             
-            if not re.search(r'endmodule\s*;?\s*$', code, re.MULTILINE | re.IGNORECASE):
+            if not _RX_ENDMODULE_EOL.search(code):
                 code += '\nendmodule'
-            
-            if self.dataset == "verilogeval":
+
+            if self._fix_names:
                 code = self.fix_module_name(code)
             
             return code.strip()
         
         return None
     
-    def salvage_module_code(self, response: str) -> Optional[str]:
-        """Last resort attempt to salvage module code"""
-        module_start = re.search(r'module\s+\w+', response, re.IGNORECASE)
-        if not module_start:
-            return None
-        
-        code = response[module_start.start():]
-        
-        endmodule_match = re.search(r'endmodule\s*;?\s*', code, re.IGNORECASE)
-        if endmodule_match:
-            code = code[:endmodule_match.end()]
-        else:
-            code = code + '\nendmodule'
-        
-        code = self.clean_extracted_code(code)
-        
-        if self.dataset == "verilogeval":
-            code = self.fix_module_name(code)
-        
-        return code
-    
     def validate_extracted_code(self, code: str) -> bool:
-        """Validate extracted code meets basic requirements"""
+        """Validate extracted code meets basic requirements (memoized)"""
         if not code:
             return False
-        
-        if not re.search(r'module\s+\w+', code, re.IGNORECASE):
-            return False
-        
-        if not re.search(r'endmodule', code, re.IGNORECASE):
+
+        key = self._memo_key(code)
+        cached = self._validate_cache.get(key)
+        if cached is not None:
+            return cached
+
+        valid = self._validate_extracted_code_impl(code)
+        self._validate_cache[key] = valid
+        return valid
+
+    def _validate_extracted_code_impl(self, code: str) -> bool:
+        # Cheapest rejections first; the count checks below subsume the
+        # old existence searches, so the string is walked far fewer times
+        if len(code) < self._min_code_length:
             return False
-        
-        if self.dataset == "verilogeval":
-            if not re.search(r'module\s+TopModule', code):
-                return False
-        else:
-            if not re.search(r'module\s+[a-zA-Z_][a-zA-Z0-9_]*', code):
-                return False
-        
+
         if '```' in code:
             return False
-        
-        module_count = len(re.findall(r'module\s+\w+', code, re.IGNORECASE))
-        endmodule_count = len(re.findall(r'endmodule', code, re.IGNORECASE))
-        
-        if module_count != 1 or endmodule_count != 1:
+
+        # Exactly one module declaration: stop at the second match instead
+        # of materializing a findall list
+        decls = _RX_MODULE_DECL.finditer(code)
+        if next(decls, None) is None or next(decls, None) is not None:
             return False
-        
-        min_length = 25 if self.dataset == "rtllm" else 30
-        if len(code) < min_length:
+
+        if code.lower().count('endmodule') != 1:
             return False
-        
-        return True
+
+        return self._name_rx.search(code) is not None
     
     def generate_direct_trial(self, description: str, trial_num: int, design_name: str) -> Optional[str]:
         """Generate single trial using direct LLM (for num_layers=0)"""
         print(f"  Trial {trial_num}: Direct", end="", flush=True)
         
-        llm = self.llm_interfaces[self.aggregator_model]
         initial_prompt = self.generate_initial_prompt(description)
         
         for attempt in range(2):
             if attempt > 0:
-                retry_prompt = initial_prompt + "\n\nREMINDER: Output ONLY the code, no explanations!"
-                if self.dataset == "verilogeval":
-                    retry_prompt += " Module name MUST be 'TopModule'!"
-                response = llm.generate_response(retry_prompt, self.system_prompt_generate)
+                retry_prompt = initial_prompt + self._retry_suffix_generate
+                response = self._call_llm(self.aggregator_model, retry_prompt,
+                                          self.system_prompt_generate)
             else:
-                response = llm.generate_response(initial_prompt, self.system_prompt_generate)
+                response = self._call_llm(self.aggregator_model, initial_prompt,
+                                          self.system_prompt_generate)
             
             if response:
                 code = self.extract_code(response)
@@ -760,6 +934,152 @@ Output the {language_spec} module now:"""
         print(" FAIL")
         return None
     
+    def _throttle(self):
+        """Block on the rate limiter when request pacing is enabled"""
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire()
+
+    def _call_llm(self, model: str, prompt: str, system_prompt: str) -> Optional[str]:
+        """
+        Issue one LLM request, coalescing duplicates at low_T
+
+        Concurrent trials often send byte-identical prompts for the same
+        model (layer 0 always does). At temperature 0 the response is
+        deterministic, so the first caller issues the request, callers
+        arriving while it is in flight wait on the same future, and
+        completed responses are reused outright. At high_T each call is
+        an independent sample, so everything goes straight through.
+        """
+        if self.temp_mode != "low_T":
+            self._throttle()
+            return self.llm_interfaces[model].generate_response(prompt, system_prompt)
+
+        key = (model, self._memo_key(prompt), self._memo_key(system_prompt or ""))
+        with self._inflight_lock:
+            cached = self._response_cache.get(key)
+            if cached is not None:
+                return cached
+            waiter = self._inflight.get(key)
+            if waiter is None:
+                waiter = Future()
+                self._inflight[key] = waiter
+                is_owner = True
+            else:
+                is_owner = False
+
+        if not is_owner:
+            return waiter.result()
+
+        try:
+            self._throttle()
+            response = self.llm_interfaces[model].generate_response(prompt, system_prompt)
+        except BaseException as exc:
+            with self._inflight_lock:
+                self._inflight.pop(key, None)
+            waiter.set_exception(exc)
+            raise
+
+        with self._inflight_lock:
+            self._inflight.pop(key, None)
+            if response:
+                # Failed calls stay uncached so a retry goes back out
+                if len(self._response_cache) >= _RESPONSE_CACHE_MAX:
+                    self._response_cache.pop(next(iter(self._response_cache)))
+                self._response_cache[key] = response
+        waiter.set_result(response)
+        return response
+
+    def _generate_layer_candidate(self, model: str, prompt: str, system_prompt: str,
+                                  retry_suffix: Optional[str] = None) -> Tuple[Optional[str], bool]:
+        """
+        Run one model's generation and extraction (thread-pool worker)
+
+        Only the LLM round-trips and extraction happen here; evaluation,
+        refinement, caching and early-stop bookkeeping stay on the caller's
+        thread once all models have returned.
+
+        Returns:
+            Tuple of (validated code or None, True if the retry prompt was used)
+        """
+        response = self._call_llm(model, prompt, system_prompt)
+        if not response:
+            # Model error/timeout: a reworded prompt will not change the
+            # outcome and the dead call already burned its timeout, so
+            # skip the retry round-trip entirely
+            self._model_failures[model] = self._model_failures.get(model, 0) + 1
+            return None, False
+
+        code = self.extract_code(response)
+        if code and self.validate_extracted_code(code):
+            self._model_failures[model] = 0
+            return code, False
+
+        # Extraction failure: the model answered but not in a usable
+        # format - a reminder retry is worthwhile unless this model has
+        # been failing repeatedly within the run
+        if retry_suffix is not None and self._model_failures.get(model, 0) < 3:
+            response = self._call_llm(model, prompt + retry_suffix, system_prompt)
+            if response:
+                code = self.extract_code(response)
+                if code and self.validate_extracted_code(code):
+                    self._model_failures[model] = 0
+                    return code, True
+
+        self._model_failures[model] = self._model_failures.get(model, 0) + 1
+        return None, False
+
+    def _aggregate_once(self, model: str, prompt: str) -> Optional[str]:
+        """One aggregator attempt: generate, extract and validate"""
+        response = self._call_llm(model, prompt, self.system_prompt_aggregate)
+        if response:
+            code = self.extract_code(response)
+            if code and self.validate_extracted_code(code):
+                return code
+        return None
+
+    def _collect_layer_results(self, futures: List, design_name: str,
+                               description: str) -> List[Tuple]:
+        """
+        Collect one layer's generation futures, scoring codes as they land
+
+        Quality scoring - or the full refinement loop when self-refinement
+        is enabled - is submitted to the scorer pool the moment each
+        model's code arrives, so it overlaps generation still running for
+        slower models, and refinement of different models' codes runs in
+        parallel instead of back to back. Results are resolved by the
+        caller before caching: the next layer selects from every candidate
+        of this layer, so the layer barrier itself cannot move, but all
+        pure-Python and iverilog work is hidden behind the slowest
+        generation within it.
+
+        Returns:
+            List of (model, code, was_retry, eval_future) in layer_models
+            order. eval_future resolves to a quality score, or to the
+            (code, quality, iterations) refinement tuple when
+            self-refinement is enabled; None when evaluation does not
+            apply (standard mode or failed extraction)
+        """
+        indices = {future: i for i, future in enumerate(futures)}
+        results = [None] * len(futures)
+
+        for future in as_completed(indices):
+            i = indices[future]
+            code, was_retry = future.result()
+            eval_future = None
+            if code and self.enable_quality_caching:
+                if self.enable_self_refinement:
+                    eval_future = self._scorer_pool.submit(
+                        self.refine_hdl_code, code, design_name, description,
+                        self.layer_models[i]
+                    )
+                else:
+                    eval_future = self._scorer_pool.submit(
+                        self.quality_evaluator.evaluate_quality, code, design_name
+                    )
+            results[i] = (self.layer_models[i], code, was_retry, eval_future)
+
+        return results
+
     def generate_moa_trial(self, description: str, trial_num: int, design_name: str) -> Optional[str]:
         """
         Generate single trial using MoA methodology (unified for both modes)
@@ -789,78 +1109,51 @@ Output the {language_spec} module now:"""
             print(f"L{layer_idx+1}", end="", flush=True)
             
             if layer_idx == 0:
-                # First layer: use initial prompt
+                # First layer: all models run concurrently on the initial
+                # prompt (each worker handles its own format retry)
                 current_layer_outputs = []
-                
-                for model in self.layer_models:
-                    llm = self.llm_interfaces[model]
-                    response = llm.generate_response(initial_prompt, self.system_prompt_generate)
-                    if response:
-                        code = self.extract_code(response)
-                        if code and self.validate_extracted_code(code):
-                            if self.enable_quality_caching:
-                                # Quality caching mode: evaluate and optionally refine
-                                if self.enable_self_refinement:
-                                    code, quality_score, refine_iters = self.refine_hdl_code(
-                                        code, design_name, description, model
-                                    )
-                                else:
-                                    quality_score = self.quality_evaluator.evaluate_quality(code, design_name)
-                                
-                                hdl_output = {
-                                    "code": code,
-                                    "model": model,
-                                    "quality_score": quality_score,
-                                    "generation_info": {
-                                        "layer_idx": layer_idx,
-                                        "prompt_type": "initial",
-                                        "generation_time": datetime.now().isoformat()
-                                    }
-                                }
-                                current_layer_outputs.append(hdl_output)
-                                
-                                # Check for perfect code (early stopping)
-                                if self.enable_early_stopping and quality_score == 1.0 and perfect_code_found is None:
-                                    perfect_code_found = code
-                                    early_stop_layer = layer_idx
-                                    print(f"[PERFECT@L{layer_idx+1}]", end="", flush=True)
-                            else:
-                                # Standard mode: just collect code
-                                current_layer_outputs.append(code)
+
+                futures = [
+                    self._layer_pool.submit(
+                        self._generate_layer_candidate, model, initial_prompt,
+                        self.system_prompt_generate, self._retry_suffix_generate
+                    )
+                    for model in self.layer_models
+                ]
+
+                for model, code, was_retry, eval_future in self._collect_layer_results(
+                        futures, design_name, description):
+                    if not code:
+                        continue
+
+                    if self.enable_quality_caching:
+                        # Quality caching mode: evaluate and optionally refine
+                        if self.enable_self_refinement:
+                            code, quality_score, refine_iters = eval_future.result()
                         else:
-                            # Retry with stronger prompt
-                            retry_prompt = initial_prompt + "\n\nREMINDER: Output ONLY the code, no explanations!"
-                            response = llm.generate_response(retry_prompt, self.system_prompt_generate)
-                            if response:
-                                code = self.extract_code(response)
-                                if code and self.validate_extracted_code(code):
-                                    if self.enable_quality_caching:
-                                        if self.enable_self_refinement:
-                                            code, quality_score, refine_iters = self.refine_hdl_code(
-                                                code, design_name, description, model
-                                            )
-                                        else:
-                                            quality_score = self.quality_evaluator.evaluate_quality(code, design_name)
-                                        
-                                        hdl_output = {
-                                            "code": code,
-                                            "model": model,
-                                            "quality_score": quality_score,
-                                            "generation_info": {
-                                                "layer_idx": layer_idx,
-                                                "prompt_type": "initial_retry",
-                                                "generation_time": datetime.now().isoformat()
-                                            }
-                                        }
-                                        current_layer_outputs.append(hdl_output)
-                                        
-                                        if self.enable_early_stopping and quality_score == 1.0 and perfect_code_found is None:
-                                            perfect_code_found = code
-                                            early_stop_layer = layer_idx
-                                            print(f"[PERFECT@L{layer_idx+1}]", end="", flush=True)
-                                    else:
-                                        current_layer_outputs.append(code)
-                
+                            quality_score = eval_future.result()
+
+                        hdl_output = {
+                            "code": code,
+                            "model": model,
+                            "quality_score": quality_score,
+                            "generation_info": {
+                                "layer_idx": layer_idx,
+                                "prompt_type": "initial_retry" if was_retry else "initial",
+                                "generation_time": datetime.now().isoformat()
+                            }
+                        }
+                        current_layer_outputs.append(hdl_output)
+
+                        # Check for perfect code (early stopping)
+                        if self.enable_early_stopping and quality_score == 1.0 and perfect_code_found is None:
+                            perfect_code_found = code
+                            early_stop_layer = layer_idx
+                            print(f"[PERFECT@L{layer_idx+1}]", end="", flush=True)
+                    else:
+                        # Standard mode: just collect code
+                        current_layer_outputs.append(code)
+
                 if self.enable_quality_caching:
                     # Cache layer outputs and continue with quality mode logic
                     if current_layer_outputs:
@@ -872,6 +1165,7 @@ Output the {language_spec} module now:"""
                 # Early stopping check after Layer 0
                 if self.enable_early_stopping and perfect_code_found is not None:
                     print(f" EARLY_STOP")
+                    cache_manager.flush()
                     return perfect_code_found
             
             else:
@@ -882,6 +1176,7 @@ Output the {language_spec} module now:"""
                     
                     if not top_quality_codes:
                         print(" [no cached input] ", end="")
+                        cache_manager.flush()
                         return None
                     
                     input_data = top_quality_codes
@@ -895,40 +1190,46 @@ Output the {language_spec} module now:"""
                 
                 current_layer_outputs = []
                 agg_prompt = self.generate_aggregation_prompt(input_data, description)
-                
-                for model in self.layer_models:
-                    llm = self.llm_interfaces[model]
-                    response = llm.generate_response(agg_prompt, self.system_prompt_aggregate)
-                    if response:
-                        code = self.extract_code(response)
-                        if code and self.validate_extracted_code(code):
-                            if self.enable_quality_caching:
-                                if self.enable_self_refinement:
-                                    code, quality_score, refine_iters = self.refine_hdl_code(
-                                        code, design_name, description, model
-                                    )
-                                else:
-                                    quality_score = self.quality_evaluator.evaluate_quality(code, design_name)
-                                
-                                hdl_output = {
-                                    "code": code,
-                                    "model": model,
-                                    "quality_score": quality_score,
-                                    "generation_info": {
-                                        "layer_idx": layer_idx,
-                                        "prompt_type": "aggregation",
-                                        "input_codes_quality": [c["quality_score"] for c in input_data] if isinstance(input_data[0], dict) else None,
-                                        "generation_time": datetime.now().isoformat()
-                                    }
-                                }
-                                current_layer_outputs.append(hdl_output)
-                                
-                                if self.enable_early_stopping and quality_score == 1.0 and perfect_code_found is None:
-                                    perfect_code_found = code
-                                    early_stop_layer = layer_idx
-                                    print(f"[PERFECT@L{layer_idx+1}]", end="", flush=True)
-                            else:
-                                current_layer_outputs.append(code)
+
+                # All models aggregate the same inputs concurrently
+                futures = [
+                    self._layer_pool.submit(
+                        self._generate_layer_candidate, model, agg_prompt,
+                        self.system_prompt_aggregate
+                    )
+                    for model in self.layer_models
+                ]
+
+                for model, code, _, eval_future in self._collect_layer_results(
+                        futures, design_name, description):
+                    if not code:
+                        continue
+
+                    if self.enable_quality_caching:
+                        if self.enable_self_refinement:
+                            code, quality_score, refine_iters = eval_future.result()
+                        else:
+                            quality_score = eval_future.result()
+
+                        hdl_output = {
+                            "code": code,
+                            "model": model,
+                            "quality_score": quality_score,
+                            "generation_info": {
+                                "layer_idx": layer_idx,
+                                "prompt_type": "aggregation",
+                                "input_codes_quality": [c["quality_score"] for c in input_data] if isinstance(input_data[0], dict) else None,
+                                "generation_time": datetime.now().isoformat()
+                            }
+                        }
+                        current_layer_outputs.append(hdl_output)
+
+                        if self.enable_early_stopping and quality_score == 1.0 and perfect_code_found is None:
+                            perfect_code_found = code
+                            early_stop_layer = layer_idx
+                            print(f"[PERFECT@L{layer_idx+1}]", end="", flush=True)
+                    else:
+                        current_layer_outputs.append(code)
                 
                 if self.enable_quality_caching:
                     if current_layer_outputs:
@@ -939,6 +1240,7 @@ Output the {language_spec} module now:"""
                 # Early stopping check after each subsequent layer
                 if self.enable_early_stopping and perfect_code_found is not None:
                     print(f" EARLY_STOP")
+                    cache_manager.flush()
                     return perfect_code_found
             
             output_count = len(current_layer_outputs)
@@ -948,34 +1250,41 @@ Output the {language_spec} module now:"""
         print(" AGG", end="", flush=True)
         
         if self.enable_quality_caching:
+            # All layers are cached by now; write the snapshot once here so
+            # the per-layer adds above only paid for journal appends
+            cache_manager.flush()
             final_input = cache_manager.get_top_quality_codes(self.n_select)
         else:
             final_input = layer_outputs
         
         if final_input:
-            llm = self.llm_interfaces[self.aggregator_model]
-            
-            for attempt in range(2):
-                final_prompt = self.generate_aggregation_prompt(final_input, description)
-                
-                if attempt > 0:
-                    final_prompt += "\n\nCRITICAL: Output ONLY the module code! No markdown, no explanations!"
-                    if self.dataset == "verilogeval":
-                        final_prompt += " Module name MUST be 'TopModule'!"
-                
-                response = llm.generate_response(final_prompt, self.system_prompt_aggregate)
-                if response:
-                    final_code = self.extract_code(response)
-                    if final_code and self.validate_extracted_code(final_code):
-                        # Apply self-refinement to final code if enabled
-                        if self.enable_self_refinement:
-                            final_code, final_quality, refine_iters = self.refine_hdl_code(
-                                final_code, design_name, description, self.aggregator_model
-                            )
-                            if refine_iters > 0:
-                                print(f"[R{refine_iters}]", end="", flush=True)
-                        print(" OK")
-                        return final_code
+            # Speculatively run the base prompt and the stricter-reminder
+            # variant in parallel instead of two sequential attempts: on
+            # the old unhappy path both calls ran anyway, back to back,
+            # so this halves final-aggregation latency in that case. The
+            # base prompt's result is still preferred when both validate.
+            base_prompt = self.generate_aggregation_prompt(final_input, description)
+            attempt_futures = [
+                self._layer_pool.submit(
+                    self._aggregate_once, self.aggregator_model, base_prompt
+                ),
+                self._layer_pool.submit(
+                    self._aggregate_once, self.aggregator_model,
+                    base_prompt + self._retry_suffix_aggregate
+                ),
+            ]
+            for future in attempt_futures:
+                final_code = future.result()
+                if final_code:
+                    # Apply self-refinement to final code if enabled
+                    if self.enable_self_refinement:
+                        final_code, final_quality, refine_iters = self.refine_hdl_code(
+                            final_code, design_name, description, self.aggregator_model
+                        )
+                        if refine_iters > 0:
+                            print(f"[R{refine_iters}]", end="", flush=True)
+                    print(" OK")
+                    return final_code
             
             # Last resort for quality caching mode
             if self.enable_quality_caching and final_input:
@@ -991,38 +1300,48 @@ Output the {language_spec} module now:"""
         desc_file = design["description"]
         
         try:
-            with open(desc_file, 'r', encoding='utf-8') as f:
-                description = f.read().strip()
+            description = _read_description(str(desc_file))
         except:
             return {"design": design_name, "error": "Cannot read description", "trials": []}
         
         print(f"Generating {design_name}:")
-        
-        trials = []
-        successful_count = 0
-        extraction_failures = 0
-        
-        for i in range(Config.N_SAMPLES):
-            trial_num = i + 1
+
+        def _run_trial(trial_num: int) -> Dict:
             code = self.generate_moa_trial(description, trial_num, design_name)
-            
-            if code:
-                trial_file = self.verilog_dir / f"t{trial_num}" / f"{design_name}{self.file_extension}"
-                try:
-                    with open(trial_file, 'w') as f:
-                        f.write(code)
-                    
-                    trial_info = {"trial": trial_num, "file": str(trial_file), "success": True}
-                    trials.append(trial_info)
-                    successful_count += 1
-                except Exception as e:
-                    trials.append({"trial": trial_num, "error": str(e), "success": False})
-            else:
-                extraction_failures += 1
-                trials.append({"trial": trial_num, "error": "Code extraction failed", "success": False})
-            
-            time.sleep(0.5)
-        
+
+            if not code:
+                return {"trial": trial_num, "error": "Code extraction failed", "success": False}
+
+            trial_file = self.verilog_dir / f"t{trial_num}" / f"{design_name}{self.file_extension}"
+            # Hand the write to the shared pool; the result is checked once
+            # all trials are in, so the disk never stalls generation
+            write_future = self._write_pool.submit(trial_file.write_text, code)
+            return {"trial": trial_num, "file": str(trial_file), "_write": write_future}
+
+        # Trials are independent (separate cache and output files per trial
+        # number), so run them concurrently; progress prints will interleave.
+        # The old 0.5s pacing sleep between trials is gone with the loop.
+        if Config.N_SAMPLES > 1:
+            with ThreadPoolExecutor(max_workers=Config.N_SAMPLES) as trial_pool:
+                trials = list(trial_pool.map(_run_trial, range(1, Config.N_SAMPLES + 1)))
+        else:
+            trials = [_run_trial(1)]
+
+        # Settle outstanding writes and record per-trial success
+        for trial in trials:
+            write_future = trial.pop("_write", None)
+            if write_future is None:
+                continue
+            try:
+                write_future.result()
+                trial["success"] = True
+            except Exception as e:
+                trial["error"] = str(e)
+                trial["success"] = False
+
+        successful_count = sum(1 for t in trials if t["success"])
+        extraction_failures = sum(1 for t in trials if t.get("error") == "Code extraction failed")
+
         return {
             "design": design_name,
             "trials": trials,
@@ -1031,8 +1350,27 @@ Output the {language_spec} module now:"""
             "total_trials": Config.N_SAMPLES
         }
     
-    def run_generation(self, designs: List[Dict]):
-        """Run MoA generation for all designs"""
+    @staticmethod
+    def _dump_json(path: Path, data: Dict):
+        """Write an indented JSON file, via orjson when available"""
+        if orjson is not None:
+            with open(path, 'wb') as f:
+                f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+        else:
+            with open(path, 'w') as f:
+                json.dump(data, f, indent=2)
+
+    def run_generation(self, designs: List[Dict], max_concurrency: int = 1):
+        """
+        Run MoA generation for all designs
+
+        Args:
+            designs: Designs to generate
+            max_concurrency: Designs processed concurrently. With trials and
+                layer models already fanned out, raising this keeps the LLM
+                server continuously loaded across design boundaries instead
+                of draining between designs.
+        """
         if self.num_layers == 0:
             print("Direct LLM HDL Generation (num_layers=0)")
             method = "Direct"
@@ -1071,17 +1409,49 @@ Output the {language_spec} module now:"""
             print("Mode: Standard MoA (no quality caching)")
         print("=" * 60)
         
-        results = []
         total_successful = 0
         total_extraction_failures = 0
-        
-        for i, design in enumerate(designs, 1):
-            print(f"[{i}/{len(designs)}] ", end="")
-            result = self.generate_design_trials(design)
-            results.append(result)
-            total_successful += result.get("successful_count", 0)
-            total_extraction_failures += result.get("extraction_failures", 0)
-            time.sleep(1)
+
+        # Per-design records stream to an NDJSON sidecar as they complete,
+        # so memory stays flat in the number of designs and a crash keeps
+        # every finished record; the summary below holds only aggregates
+        details_path = self.verilog_dir / "generation_summary.ndjson"
+        with open(details_path, 'wb') as details_file:
+
+            def record(result: Dict):
+                nonlocal total_successful, total_extraction_failures
+                if orjson is not None:
+                    details_file.write(orjson.dumps(result))
+                else:
+                    details_file.write(json.dumps(result).encode('utf-8'))
+                details_file.write(b'\n')
+                total_successful += result.get("successful_count", 0)
+                total_extraction_failures += result.get("extraction_failures", 0)
+
+            if max_concurrency <= 1:
+                for i, design in enumerate(designs, 1):
+                    print(f"[{i}/{len(designs)}] ", end="")
+                    record(self.generate_design_trials(design))
+            else:
+                # Designs are independent; a bounded pool keeps max_concurrency
+                # of them in flight so new requests enter the server as others
+                # drain (progress prints will interleave across designs)
+                with ThreadPoolExecutor(max_workers=max_concurrency) as design_pool:
+                    futures = [
+                        design_pool.submit(self.generate_design_trials, design)
+                        for design in designs
+                    ]
+                    for i, future in enumerate(futures, 1):
+                        try:
+                            result = future.result()
+                        except Exception as e:
+                            result = {
+                                "design": designs[i-1].get("name", "unknown"),
+                                "error": str(e),
+                                "trials": []
+                            }
+                        print(f"[{i}/{len(designs)}] {result.get('design', 'unknown')} done")
+                        record(result)
         
         # Save generation summary
         summary = {
@@ -1105,11 +1475,10 @@ Output the {language_spec} module now:"""
             "extraction_failures": total_extraction_failures,
             "success_rate": f"{total_successful/(len(designs)*Config.N_SAMPLES)*100:.1f}%",
             "extraction_failure_rate": f"{total_extraction_failures/(len(designs)*Config.N_SAMPLES)*100:.1f}%",
-            "details": results
+            "details_file": details_path.name
         }
         
-        with open(self.verilog_dir / "generation_summary.json", 'w') as f:
-            json.dump(summary, f, indent=2)
+        self._dump_json(self.verilog_dir / "generation_summary.json", summary)
         
         print(f"\nGeneration complete: {total_successful}/{len(designs)*Config.N_SAMPLES} successful")
         print(f"Extraction failures: {total_extraction_failures}")
@@ -1117,8 +1486,7 @@ Output the {language_spec} module now:"""
         
         if self.enable_quality_caching and self.num_layers > 0:
             cache_analysis = self.global_cache_manager.generate_global_analysis()
-            with open(self.cache_dir / "cache_analysis.json", 'w') as f:
-                json.dump(cache_analysis, f, indent=2)
+            self._dump_json(self.cache_dir / "cache_analysis.json", cache_analysis)
             print(f"Cache analysis: {self.cache_dir / 'cache_analysis.json'}")
         
         return self.verilog_dir, self.result_dir
@@ -1144,74 +1512,79 @@ Output the {language_spec} module now:"""
         
         return self.result_dir / "results.json"
 
+def _str2bool(value: str) -> bool:
+    """Parse the truthy spellings the old hand-rolled CLI accepted"""
+    return value.lower() in ['true', '1', 'yes', 'on']
+
+
+def _build_arg_parser() -> argparse.ArgumentParser:
+    """CLI for MoA_verify; keeps the long-standing --flag=value surface"""
+    parser = argparse.ArgumentParser(
+        description="Enhanced Mixture-of-Agents HDL generation"
+    )
+    parser.add_argument('--layers', dest='num_layers', type=int, default=2,
+                        help="Number of MoA layers (0 for direct generation)")
+    parser.add_argument('--models', dest='layer_models',
+                        type=lambda s: s.split(','),
+                        default=['qwen2.5-coder:7b'] * 3,
+                        help="Comma-separated models per layer")
+    parser.add_argument('--aggregator', dest='aggregator_model',
+                        default='qwen2.5-coder:7b',
+                        help="Final aggregator model")
+    parser.add_argument('--dataset', default='rtllm',
+                        help="Dataset: rtllm or verilogeval")
+    parser.add_argument('--temp', dest='temp_mode', default='high_T',
+                        help="Temperature mode: low_T or high_T")
+    parser.add_argument('--quality_cache', dest='enable_quality_caching',
+                        type=_str2bool, nargs='?', const=True, default=True,
+                        help="Quality-based caching (default: on)")
+    parser.add_argument('--early_stop', dest='enable_early_stopping',
+                        type=_str2bool, nargs='?', const=True, default=False,
+                        help="Stop when perfect HDL is found")
+    parser.add_argument('--self_refine', dest='enable_self_refinement',
+                        type=_str2bool, nargs='?', const=True, default=False,
+                        help="Iteratively fix HDL errors with iverilog feedback")
+    parser.add_argument('--no_self_refine', dest='enable_self_refinement',
+                        action='store_const', const=False, default=False,
+                        help="Disable self-refinement")
+    parser.add_argument('--max_refine_iters', type=int, default=3,
+                        help="Maximum self-refinement iterations")
+    parser.add_argument('--concurrency', type=int,
+                        default=Config.MAX_CONCURRENT_DESIGNS,
+                        help="Designs processed concurrently")
+    parser.add_argument('--rpm', type=int, default=0,
+                        help="Request quota per minute (0 disables pacing)")
+    return parser
+
+
 def main():
     """Main function with command line interface"""
-    import sys
-    
-    # Default configuration
-    layer_models = ['qwen2.5-coder:7b', 'qwen2.5-coder:7b', 'qwen2.5-coder:7b']
-    aggregator_model = 'qwen2.5-coder:7b'
-    num_layers = 2
-    dataset = 'rtllm'
-    temp_mode = 'high_T'
-    enable_quality_caching = True
-    enable_early_stopping = False
-    enable_self_refinement = False  
-    max_self_refinement_iterations = 3  
-    
-    # Parse command line arguments
-    for arg in sys.argv[1:]:
-        if arg.startswith('--layers='):
-            num_layers = int(arg.split('=')[1])
-        elif arg.startswith('--models='):
-            models_str = arg.split('=')[1]
-            layer_models = models_str.split(',')
-        elif arg.startswith('--aggregator='):
-            aggregator_model = arg.split('=')[1]
-        elif arg.startswith('--dataset='):
-            dataset = arg.split('=')[1]
-        elif arg.startswith('--temp='):
-            temp_mode = arg.split('=')[1]
-        elif arg.startswith('--quality_cache='):
-            enable_quality_caching = arg.split('=')[1].lower() in ['true', '1', 'yes', 'on']
-        elif arg == '--quality_cache':
-            enable_quality_caching = True
-        elif arg.startswith('--early_stop='):
-            enable_early_stopping = arg.split('=')[1].lower() in ['true', '1', 'yes', 'on']
-        elif arg == '--early_stop':
-            enable_early_stopping = True
-        elif arg.startswith('--self_refine='):
-            enable_self_refinement = arg.split('=')[1].lower() in ['true', '1', 'yes', 'on']
-        elif arg == '--self_refine':
-            enable_self_refinement = True
-        elif arg == '--no_self_refine':
-            enable_self_refinement = False
-        elif arg.startswith('--max_refine_iters='):
-            max_self_refinement_iterations = int(arg.split('=')[1])
-    
+    args = _build_arg_parser().parse_args()
+
     # Load designs
-    designs = load_designs(dataset)
+    designs = load_designs(args.dataset)
     if not designs:
-        print(f"No {dataset} designs found")
+        print(f"No {args.dataset} designs found")
         return
     
     print(f"Loaded {len(designs)} designs")
     
     # Initialize generator
     generator = EnhancedMoAHDLGenerator(
-        layer_models=layer_models,
-        aggregator_model=aggregator_model,
-        num_layers=num_layers,
-        dataset=dataset,
-        temp_mode=temp_mode,
-        enable_quality_caching=enable_quality_caching,
-        enable_early_stopping=enable_early_stopping,
-        enable_self_refinement=enable_self_refinement,
-        max_self_refinement_iterations=max_self_refinement_iterations
+        layer_models=args.layer_models,
+        aggregator_model=args.aggregator_model,
+        num_layers=args.num_layers,
+        dataset=args.dataset,
+        temp_mode=args.temp_mode,
+        enable_quality_caching=args.enable_quality_caching,
+        enable_early_stopping=args.enable_early_stopping,
+        enable_self_refinement=args.enable_self_refinement,
+        max_self_refinement_iterations=args.max_refine_iters,
+        requests_per_minute=args.rpm
     )
     
     # Run generation
-    verilog_dir, result_dir = generator.run_generation(designs)
+    verilog_dir, result_dir = generator.run_generation(designs, max_concurrency=args.concurrency)
     
     # Run testing
     print("\nStarting testing phase...")
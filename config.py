@@ -3,40 +3,127 @@
 Configuration for RTLLM (Verilog) and VerilogEval (SystemVerilog) Benchmark Testing with Qwen2.5
 """
 
+from functools import lru_cache
 from pathlib import Path
+from types import MappingProxyType
 import math
 import os
 
+@lru_cache(maxsize=4096)
+def _pass_at_k(n: int, c: int, k: int) -> float:
+    """Memoized hypergeometric core of Config.calculate_pass_at_k
+
+    Analysis evaluates every (design, k) pair but the distinct
+    (n, c, k) triples are few, so each combination pays the
+    math.comb big-int arithmetic once per process.
+    """
+    try:
+        prob_all_wrong = math.comb(n - c, k) / math.comb(n, k)
+        return 1.0 - prob_all_wrong
+    except (ValueError, ZeroDivisionError):
+        return 0.0
+
+
+@lru_cache(maxsize=256)
+def _folder_name(model_name: str, method: str, temp_mode: str,
+                 cpp_validation: bool, cpp_iterations: int,
+                 prescreening: bool, refinement: bool,
+                 refine_iterations: int) -> str:
+    """Pure, cached body of Config.get_folder_name
+
+    The mutable Config toggles are part of the key, so flipping a flag
+    at startup (run.py does) can never serve a stale folder name.
+    """
+    base_name = model_name.replace(":", "_").replace(".", "_").replace("-", "_")
+    suffix_parts = []
+
+    if method != "direct":
+        suffix_parts.append(method)
+
+    suffix_parts.append(temp_mode)
+
+    if method == "cpp_chain" and cpp_validation:
+        suffix_parts.append(f"cppval{cpp_iterations}")
+
+    if prescreening:
+        suffix_parts.append("prescreen")
+
+    if refinement:
+        suffix_parts.append(f"refine{refine_iterations}")
+
+    if suffix_parts:
+        return f"{base_name}_{'_'.join(suffix_parts)}"
+    return f"{base_name}_{temp_mode}"
+
+
+@lru_cache(maxsize=256)
+def _output_dirs(folder_name: str, temp_mode: str, dataset: str) -> tuple:
+    """Cached Path construction for Config.get_output_dirs"""
+    temp_folder = Path(temp_mode)
+
+    if dataset == "verilogeval":
+        return (Config.VERILOG_EVAL_BASE_DIR / temp_folder / folder_name,
+                Config.RESULT_EVAL_BASE_DIR / temp_folder / folder_name)
+    return (Config.VERILOG_BASE_DIR / temp_folder / folder_name,
+            Config.RESULT_BASE_DIR / temp_folder / folder_name)
+
+
+@lru_cache(maxsize=None)
+def _model_params(model_name: str, temp_mode: str) -> MappingProxyType:
+    """Build the merged parameter mapping for Config.get_model_params
+
+    Cached per (model, temp_mode); the proxy keeps the shared mapping
+    immutable so one caller cannot mutate what every other caller sees.
+    """
+    base_params = Config.LLM_PARAMS.get(model_name, Config.DEFAULT_PARAMS).copy()
+
+    if temp_mode == "low_T":
+        base_params.update(Config.LOW_T_PARAMS)
+    elif temp_mode == "high_T":
+        base_params.update(Config.HIGH_T_PARAMS)
+    else:
+        raise ValueError(f"Unknown temperature mode: {temp_mode}")
+
+    return MappingProxyType(base_params)
+
 class Config:
     # Qwen2.5 models - optimized for coding tasks
-    QWEN_MODELS = [
+    QWEN_MODELS = (
         "qwen2.5:14b",
         "qwen2.5:7b",
         # "qwen2.5:32b",
         # "qwen2.5:72b"
-    ]
+    )
     
     # OpenAI models - NEW: Added GPT-4o support
-    OPENAI_MODELS = [
+    OPENAI_MODELS = (
         "gpt-4o",
         "gpt-4o-mini",
-    ]
+    )
     
     # OpenAI API Configuration - NEW
     OPENAI_API_KEY = ""  # Set via environment or modify here
     OPENAI_BASE_URL = "https://api.openai.com/v1"  # Can be changed for proxy/alternative endpoints
     
     # Supported datasets
-    DATASET_TYPES = ["rtllm", "verilogeval"]
+    DATASET_TYPES = ("rtllm", "verilogeval")
     
     # Generation methods
-    GENERATION_METHODS = [
+    GENERATION_METHODS = (
         "direct",      # Direct RTL generation (existing)
         "cpp_chain"    # C++ intermediate + RTL generation (new)
-    ]
+    )
     
     # Temperature settings
-    TEMPERATURE_MODES = ["low_T", "high_T"]
+    TEMPERATURE_MODES = ("low_T", "high_T")
+
+    # Frozenset views of the tuples above for O(1) membership checks;
+    # the tuples stay the iteration order everywhere they are printed
+    QWEN_MODEL_SET = frozenset(QWEN_MODELS)
+    OPENAI_MODEL_SET = frozenset(OPENAI_MODELS)
+    DATASET_TYPE_SET = frozenset(DATASET_TYPES)
+    GENERATION_METHOD_SET = frozenset(GENERATION_METHODS)
+    TEMPERATURE_MODE_SET = frozenset(TEMPERATURE_MODES)
     
     # Directories for RTLLM dataset
     RTLLM_DIR = Path("./RTLLM")
@@ -50,6 +137,15 @@ class Config:
     
     # Generation control
     OVERWRITE_EXISTING = False  # Set to True to overwrite existing files
+
+    # Concurrency settings
+    # Designs processed in parallel by the MoA generators (--concurrency
+    # overrides). Generation is I/O-bound on the LLM server, so raising
+    # this overlaps designs up to server capacity: set OLLAMA_NUM_PARALLEL
+    # (concurrent requests per loaded model) and OLLAMA_MAX_LOADED_MODELS
+    # on the Ollama server to match the total fan-out, or throughput
+    # saturates at the server's queue.
+    MAX_CONCURRENT_DESIGNS = 1
     
     # Iterative refinement settings
     ENABLE_ITERATIVE_REFINEMENT = False  # Toggle iterative refinement
@@ -63,6 +159,14 @@ class Config:
     ENABLE_CPP_VALIDATION = False  # Toggle C++ validation
     CPP_VALIDATION_MODE = "on_failure"  # "always" | "on_failure" | "never"
     MAX_CPP_REFINEMENT_ITERATIONS = 3  # Maximum attempts to fix C++ code
+    # Optional smaller/quantized model for the validation verdicts only
+    # (e.g. "qwen2.5:7b-instruct-q4_K_M"); verdicts are short and
+    # tolerant, so a cheaper model halves their decode cost. Refinement
+    # keeps the generation model. None = use the generation model.
+    CPP_VALIDATOR_MODEL = None
+    # Persistent store for LLM-based validation verdicts; reruns over the
+    # same corpus hit it instead of repeating identical LLM calls
+    CPP_VALIDATION_CACHE_DB = Path("./cpp_validation_cache.db")
     
     # Simulation settings
     SIMULATION_TIMEOUT = 30  # seconds for vvp simulation
@@ -83,37 +187,45 @@ class Config:
     }
    
     # Qwen2.5-optimized base parameters - leveraging its coding strengths
+    # "backend" selects the serving stack the interface factory binds to;
+    # models without an entry fall back to name-based detection
     LLM_PARAMS = {
         "qwen2.5:7b": {
             "context_length": 32768,  # Qwen2.5 supports long context
             "num_predict": 2048,     # Sufficient for code generation
-            "timeout": 90
+            "timeout": 90,
+            "backend": "ollama"
         },
         "qwen2.5:14b": {
             "context_length": 32768,
             "num_predict": 2048,
-            "timeout": 120
+            "timeout": 120,
+            "backend": "ollama"
         },
         "qwen2.5:32b": {
             "context_length": 128000, # Max context for large model
             "num_predict": 3072,
-            "timeout": 180
+            "timeout": 180,
+            "backend": "ollama"
         },
         "qwen2.5:72b": {
             "context_length": 128000,
             "num_predict": 4096,     # Most tokens for best model
-            "timeout": 240
+            "timeout": 240,
+            "backend": "ollama"
         },
         # NEW: OpenAI GPT-4o parameters
         "gpt-4o": {
             "context_length": 128000,
             "num_predict": 4096,
-            "timeout": 120
+            "timeout": 120,
+            "backend": "openai"
         },
         "gpt-4o-mini": {
             "context_length": 128000,
             "num_predict": 4096,
-            "timeout": 90
+            "timeout": 90,
+            "backend": "openai"
         }
     }
     
@@ -129,68 +241,44 @@ class Config:
     
     @classmethod
     def get_model_params(cls, model_name: str, temp_mode: str = "low_T") -> dict:
-        """Get model parameters with temperature mode"""
-        base_params = cls.LLM_PARAMS.get(model_name, cls.DEFAULT_PARAMS).copy()
-        
-        if temp_mode == "low_T":
-            base_params.update(cls.LOW_T_PARAMS)
-        elif temp_mode == "high_T":
-            base_params.update(cls.HIGH_T_PARAMS)
-        else:
-            raise ValueError(f"Unknown temperature mode: {temp_mode}")
-        
-        return base_params
+        """Get model parameters with temperature mode
+
+        The mapping is cached per (model, temp_mode) and returned
+        read-only - it is requested on every LLM call, so the dict
+        copy+update runs once per combination instead of per call.
+        Derive modified parameters with {**params, ...}.
+        """
+        return _model_params(model_name, temp_mode)
     
     @classmethod
     def is_openai_model(cls, model_name: str) -> bool:
         """NEW: Check if model is an OpenAI model"""
-        return model_name in cls.OPENAI_MODELS
+        return model_name in cls.OPENAI_MODEL_SET
+
+    @classmethod
+    def get_backend(cls, model_name: str) -> str:
+        """Serving backend for a model: explicit LLM_PARAMS entry wins,
+        otherwise fall back to name-based detection"""
+        backend = cls.LLM_PARAMS.get(model_name, {}).get("backend")
+        if backend:
+            return backend
+        return "openai" if cls.is_openai_model(model_name) else "ollama"
     
     @classmethod
     def get_folder_name(cls, model_name: str, method: str = "direct", 
                        temp_mode: str = "low_T", dataset: str = "rtllm") -> str:
         """Get folder name for model, method, temperature and dataset combination"""
-        base_name = model_name.replace(":", "_").replace(".", "_").replace("-", "_")  # Modified: handle GPT model names
-        suffix_parts = []
-        
-        if method != "direct":
-            suffix_parts.append(method)
-        
-        # Add temperature mode
-        suffix_parts.append(temp_mode)
-        
-        # Add C++ validation indicator with iteration count if applicable
-        if method == "cpp_chain" and cls.ENABLE_CPP_VALIDATION:
-            # Include the number of C++ refinement iterations in the folder name
-            suffix_parts.append(f"cppval{cls.MAX_CPP_REFINEMENT_ITERATIONS}")
-        
-        # Add prescreening indicator
-        if cls.ENABLE_PRESCREENING:
-            suffix_parts.append("prescreen")
-        
-        # Add Verilog refinement indicator with iteration count
-        if cls.ENABLE_ITERATIVE_REFINEMENT:
-            suffix_parts.append(f"refine{cls.MAX_REFINEMENT_ITERATIONS}")
-        
-        if suffix_parts:
-            return f"{base_name}_{'_'.join(suffix_parts)}"
-        return f"{base_name}_{temp_mode}"
+        return _folder_name(model_name, method, temp_mode,
+                            cls.ENABLE_CPP_VALIDATION, cls.MAX_CPP_REFINEMENT_ITERATIONS,
+                            cls.ENABLE_PRESCREENING, cls.ENABLE_ITERATIVE_REFINEMENT,
+                            cls.MAX_REFINEMENT_ITERATIONS)
     
     @classmethod
     def get_output_dirs(cls, model_name: str, method: str = "direct", 
                        temp_mode: str = "low_T", dataset: str = "rtllm") -> tuple:
         """Get verilog and result output directories based on dataset"""
         folder_name = cls.get_folder_name(model_name, method, temp_mode, dataset)
-        temp_folder = Path(temp_mode)
-        
-        if dataset == "verilogeval":
-            verilog_dir = cls.VERILOG_EVAL_BASE_DIR / temp_folder / folder_name
-            result_dir = cls.RESULT_EVAL_BASE_DIR / temp_folder / folder_name
-        else:  # rtllm
-            verilog_dir = cls.VERILOG_BASE_DIR / temp_folder / folder_name
-            result_dir = cls.RESULT_BASE_DIR / temp_folder / folder_name
-            
-        return verilog_dir, result_dir
+        return _output_dirs(folder_name, temp_mode, dataset)
     
     @classmethod
     def get_design_path(cls, design_name: str) -> Path:
@@ -225,15 +313,10 @@ class Config:
         if k > n:
             k = n  # Can't draw more samples than we have
         
-        try:
-            # If there aren't enough incorrect samples to fill k draws,
-            # we're guaranteed to get at least one correct sample
-            if (n - c) < k:
-                return 1.0
-            
-            # Standard case: P(all k samples incorrect) = C(n-c, k) / C(n, k)
-            prob_all_wrong = math.comb(n - c, k) / math.comb(n, k)
-            return 1.0 - prob_all_wrong
-            
-        except (ValueError, ZeroDivisionError):
-            return 0.0
+        # If there aren't enough incorrect samples to fill k draws,
+        # we're guaranteed to get at least one correct sample
+        if (n - c) < k:
+            return 1.0
+
+        # Standard case: P(all k samples incorrect) = C(n-c, k) / C(n, k)
+        return _pass_at_k(n, c, k)
@@ -4,24 +4,295 @@ C++ Validator Module - Validates and refines intermediate C++ code in cpp_chain
 Performs functional validation and HLS compatibility checks for generated C++ code
 """
 
+import hashlib
+import json
 import re
+import sqlite3
+import threading
 import time
-from pathlib import Path
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Optional, Tuple, List
 from config import Config
 
+# Bound on memoized validation results per validator instance
+_VALIDATION_CACHE_MAX = 256
+
+# Result kinds worth persisting across runs - only those that cost an
+# LLM round-trip; structural checks are cheap regex
+_PERSISTED_KINDS = frozenset({'func', 'oneshot'})
+
+# Row bound for the on-disk validation cache
+_VALIDATION_DB_MAX_ROWS = 4096
+
+# Refinement prompt budget in characters (~4k tokens at ~4 chars each)
+# and the context window shown around each located issue when the code
+# itself does not fit
+_REFINE_CODE_CHAR_BUDGET = 16000
+_ISSUE_WINDOW_LINES = 20
+
+
+def _select_issues(issues: List[Dict]) -> List[Dict]:
+    """Errors before warnings, one issue per type, capped at five"""
+    ordered = sorted(issues, key=lambda i: 0 if i.get('severity') == 'error' else 1)
+    seen = set()
+    selected = []
+    for issue in ordered:
+        if issue['type'] in seen:
+            continue
+        seen.add(issue['type'])
+        selected.append(issue)
+        if len(selected) == 5:
+            break
+    return selected
+
+
+def _window_code(cpp_code: str, issues: List[Dict]):
+    """Code view showing only lines around located issues
+
+    Returns (display_code, elided_segments); each elided gap is replaced
+    by a numbered marker line and its original text kept so the model's
+    response can be spliced back into a complete file. Returns the full
+    code with no segments when no issue carries a line number.
+    """
+    lines = cpp_code.split('\n')
+    keep = set()
+    for issue in issues:
+        line = issue.get('line')
+        if line is None:
+            continue
+        keep.update(range(max(0, line - _ISSUE_WINDOW_LINES),
+                          min(len(lines), line + _ISSUE_WINDOW_LINES + 1)))
+    if not keep:
+        return cpp_code, {}
+    
+    display = []
+    segments = {}
+    kept = sorted(keep)
+    
+    def _elide(start, stop):
+        marker = f"// [[ELIDED-{len(segments)}]]"
+        segments[marker] = '\n'.join(lines[start:stop])
+        display.append(marker)
+    
+    if kept[0] > 0:
+        _elide(0, kept[0])
+    prev = None
+    for index in kept:
+        if prev is not None and index > prev + 1:
+            _elide(prev + 1, index)
+        display.append(lines[index])
+        prev = index
+    if kept[-1] < len(lines) - 1:
+        _elide(kept[-1] + 1, len(lines))
+    
+    return '\n'.join(display), segments
+
+
+def _splice_elided(code: str, segments: Dict[str, str]) -> Optional[str]:
+    """Restore elided segments into a refined windowed view
+
+    Every marker must survive exactly once, otherwise the response
+    cannot be reassembled safely and None is returned.
+    """
+    for marker, original in segments.items():
+        if code.count(marker) != 1:
+            return None
+        code = code.replace(marker, original)
+    return code
+
+# Batch dispatch bins by prompt size (characters); short verdict-sized
+# prompts go out ahead of long ones so they are not queued behind a
+# handful of large-context requests
+_LENGTH_BINS = (1024, 4096, 16384)
+
+
+def _length_bin(size: int) -> int:
+    """Index of the length bin a prompt of `size` characters falls in"""
+    for index, bound in enumerate(_LENGTH_BINS):
+        if size < bound:
+            return index
+    return len(_LENGTH_BINS)
+
+
+def _content_key(*parts: str) -> str:
+    """Stable digest of validation inputs for cache keys"""
+    h = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        h.update(part.encode('utf-8', errors='replace'))
+        h.update(b'\x00')
+    return h.hexdigest()
+
+# Precompiled structural checks - validate_cpp_structure runs once per
+# candidate per refinement iteration, so the patterns compile once here
+# and each category costs a single pass over the code
+_DYN_MEM_RE = re.compile(r'\bnew\b|\bdelete\b|\bmalloc\b|\bfree\b|vector<|list<|map<')
+_BITWIDTH_RE = re.compile(r'\b(?:u?int(?:8|16|32)_t|bool)\b')
+_FUNC_HEAD_RE = re.compile(r'(\w+)\s*\(([^)]*)\)\s*\{')
+_IDENT_RE = re.compile(r'\w+')
+_WHILE_RE = re.compile(r'while\s*\(([^)]*)\)')
+
+# Headers matched by _FUNC_HEAD_RE that are control flow, not functions
+_CONTROL_KEYWORDS = frozenset({'if', 'while', 'for', 'switch', 'else', 'do', 'return', 'sizeof'})
+
+
+def _iter_functions(src: str):
+    """Yield (name, body, start) for each brace-matched function in src
+
+    A single forward scan with a brace-depth counter; the old DOTALL
+    regex backtracked quadratically on large files and stopped at the
+    first '}' even inside nested blocks, truncating the body.
+    """
+    pos = 0
+    length = len(src)
+    while True:
+        match = _FUNC_HEAD_RE.search(src, pos)
+        if match is None:
+            return
+        depth = 1
+        index = match.end()
+        while index < length and depth:
+            char = src[index]
+            if char == '{':
+                depth += 1
+            elif char == '}':
+                depth -= 1
+            index += 1
+        if depth:
+            # Unbalanced braces - nothing reliable past this point
+            return
+        yield match.group(1), src[match.end():index - 1], match.start()
+        pos = index
+_JSON_BLOCK_RE = re.compile(r'```json\s*(.*?)```', re.DOTALL)
+_CODE_FENCE_RE = re.compile(r'```[^\n]*\n(.*?)\n?```', re.DOTALL)
+_OPEN_FENCE_RE = re.compile(r'```[^\n]*\n(.*)\Z', re.DOTALL)
+_CODE_HEADER_RE = re.compile(r'^[ \t]*(?:#include|void |int |uint|bool |class |struct )',
+                             re.MULTILINE)
+
+# Error-triage indicator phrases, compiled as alternations so
+# should_fix_cpp scores the error text in one pass per category instead
+# of one substring scan per phrase
+_CPP_INDICATOR_RE = re.compile(
+    '|'.join(map(re.escape, [
+        'wrong output',
+        'incorrect result',
+        'mismatch in expected',
+        'logic error',
+        'wrong calculation',
+        'incorrect algorithm',
+    ])), re.IGNORECASE)
+
+_VERILOG_INDICATOR_RE = re.compile(
+    '|'.join(map(re.escape, [
+        'synthesis',
+        'timing',
+        'clock',
+        'reset',
+        'sensitivity list',
+        'always block',
+    ])), re.IGNORECASE)
+
+# Errors that can only come from the Verilog side; seeing one means the
+# C++ is not worth re-validating at all
+_VERILOG_ONLY_RE = re.compile(r'\b(setup|hold|slack|sensitivity list|non[- ]?blocking)\b',
+                              re.IGNORECASE)
+
+# Indicator score at which the Verilog attribution is trusted outright
+_VERILOG_SCORE_SHORT_CIRCUIT = 2
+
 class CppValidator:
-    def __init__(self, llm_interface, max_iterations: int = 2):
+    def __init__(self, llm_interface, max_iterations: int = 2, validator_llm=None):
         """
         Initialize C++ validator
         
         Args:
             llm_interface: LLM interface for validation and refinement
             max_iterations: Maximum refinement iterations for C++ code
+            validator_llm: Optional cheaper interface for verdict-only
+                           prompts (Config.CPP_VALIDATOR_MODEL); code
+                           refinement always uses llm_interface
         """
         self.llm = llm_interface
+        self.validator_llm = validator_llm if validator_llm is not None else llm_interface
         self.max_iterations = max_iterations
-        self.validation_cache = {}
+        # LRU of validation results keyed by content digest; refinement
+        # often loops on identical code, and a functional-validation hit
+        # skips a whole LLM round-trip
+        self.validation_cache = OrderedDict()
+        # Times should_fix_cpp resolved without touching the LLM; useful
+        # for tuning _VERILOG_SCORE_SHORT_CIRCUIT against real runs
+        self.short_circuit_hits = 0
+        # Persistent layer under the in-memory LRU so development reruns
+        # over the same corpus skip identical LLM validations entirely
+        self._db = None
+        self._db_lock = threading.Lock()
+        try:
+            self._db = sqlite3.connect(str(Config.CPP_VALIDATION_CACHE_DB),
+                                       check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS validation_cache ("
+                "kind TEXT NOT NULL, hash TEXT NOT NULL, "
+                "result_json TEXT NOT NULL, ts REAL NOT NULL, "
+                "PRIMARY KEY (kind, hash))")
+            self._db.commit()
+        except Exception as e:
+            print(f"Warning: validation cache DB unavailable: {e}")
+            self._db = None
+        # Concurrent lanes for batch validation; sized like the design
+        # fan-out so the LLM server sees parallel requests instead of a
+        # serial queue (see MAX_CONCURRENT_DESIGNS notes in config.py)
+        self._batch_pool = ThreadPoolExecutor(max_workers=4)
+
+    def _cache_get(self, key) -> Optional[Dict]:
+        """Look up a memoized validation result, refreshing recency"""
+        result = self.validation_cache.get(key)
+        if result is not None:
+            self.validation_cache.move_to_end(key)
+            return result
+        
+        kind, digest = key
+        if self._db is None or kind not in _PERSISTED_KINDS:
+            return None
+        try:
+            with self._db_lock:
+                row = self._db.execute(
+                    "SELECT result_json FROM validation_cache WHERE kind=? AND hash=?",
+                    (kind, digest)).fetchone()
+        except Exception:
+            return None
+        if row is None:
+            return None
+        result = json.loads(row[0])
+        # Promote into the in-memory LRU for later same-run lookups
+        self.validation_cache[key] = result
+        if len(self.validation_cache) > _VALIDATION_CACHE_MAX:
+            self.validation_cache.popitem(last=False)
+        return result
+
+    def _cache_put(self, key, result: Dict):
+        """Memoize a validation result, evicting the least recent"""
+        self.validation_cache[key] = result
+        if len(self.validation_cache) > _VALIDATION_CACHE_MAX:
+            self.validation_cache.popitem(last=False)
+        
+        kind, digest = key
+        if self._db is None or kind not in _PERSISTED_KINDS:
+            return
+        try:
+            with self._db_lock:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO validation_cache VALUES (?, ?, ?, ?)",
+                    (kind, digest, json.dumps(result), time.time()))
+                # Keep the newest rows; drop anything past the bound
+                self._db.execute(
+                    "DELETE FROM validation_cache WHERE rowid IN ("
+                    "SELECT rowid FROM validation_cache "
+                    "ORDER BY ts DESC LIMIT -1 OFFSET ?)",
+                    (_VALIDATION_DB_MAX_ROWS,))
+                self._db.commit()
+        except Exception as e:
+            print(f"Warning: failed to persist validation result: {e}")
         
     def validate_cpp_structure(self, cpp_code: str) -> Dict:
         """
@@ -33,29 +304,37 @@ class CppValidator:
         Returns:
             Dictionary with validation results
         """
+        cache_key = ('struct', _content_key(cpp_code))
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            return cached
+
         issues = []
         
         # Check for dynamic memory allocation
-        if any(keyword in cpp_code for keyword in ['new ', 'delete ', 'malloc', 'free', 'vector<', 'list<', 'map<']):
+        match = _DYN_MEM_RE.search(cpp_code)
+        if match:
             issues.append({
                 'type': 'dynamic_memory',
                 'severity': 'error',
-                'message': 'Dynamic memory allocation detected - not HLS compatible'
+                'message': 'Dynamic memory allocation detected - not HLS compatible',
+                'line': cpp_code.count('\n', 0, match.start())
             })
         
         # Check for recursive functions
-        function_pattern = r'(\w+)\s*\([^)]*\)\s*{([^}]*)}'
-        functions = re.findall(function_pattern, cpp_code, re.DOTALL)
-        for func_name, func_body in functions:
-            if func_name in func_body:
+        for func_name, func_body, start in _iter_functions(cpp_code):
+            if func_name in _CONTROL_KEYWORDS:
+                continue
+            if func_name in set(_IDENT_RE.findall(func_body)):
                 issues.append({
                     'type': 'recursion',
                     'severity': 'error',
-                    'message': f'Recursive function {func_name} detected - not HLS compatible'
+                    'message': f'Recursive function {func_name} detected - not HLS compatible',
+                    'line': cpp_code.count('\n', 0, start)
                 })
         
         # Check for proper bit-width types
-        if not any(btype in cpp_code for btype in ['uint8_t', 'uint16_t', 'uint32_t', 'int8_t', 'int16_t', 'int32_t', 'bool']):
+        if not _BITWIDTH_RE.search(cpp_code):
             issues.append({
                 'type': 'bit_width',
                 'severity': 'warning',
@@ -63,22 +342,24 @@ class CppValidator:
             })
         
         # Check for unbounded loops
-        while_pattern = r'while\s*\([^)]*\)'
-        while_loops = re.findall(while_pattern, cpp_code)
-        for loop in while_loops:
-            if 'true' in loop.lower() or '1' == loop.strip()[-2]:
+        for match in _WHILE_RE.finditer(cpp_code):
+            condition = match.group(1)
+            if 'true' in condition.lower() or condition.strip() == '1':
                 issues.append({
                     'type': 'unbounded_loop',
                     'severity': 'error',
-                    'message': 'Potentially unbounded while loop detected'
+                    'message': 'Potentially unbounded while loop detected',
+                    'line': cpp_code.count('\n', 0, match.start())
                 })
         
-        return {
+        result = {
             'valid': len([i for i in issues if i['severity'] == 'error']) == 0,
             'issues': issues,
             'warnings': len([i for i in issues if i['severity'] == 'warning']),
             'errors': len([i for i in issues if i['severity'] == 'error'])
         }
+        self._cache_put(cache_key, result)
+        return result
     
     def validate_cpp_functionality(self, cpp_code: str, design_spec: str) -> Dict:
         """
@@ -91,6 +372,11 @@ class CppValidator:
         Returns:
             Dictionary with functional validation results
         """
+        cache_key = ('func', _content_key(cpp_code, design_spec))
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            return cached
+
         prompt = f"""Analyze if this C++ code correctly implements the specified functionality.
 
 Design Specification:
@@ -115,25 +401,193 @@ Be concise and specific."""
 
         system_role = "You are an expert in hardware design and HLS C++ programming. Analyze code functionality against specifications precisely."
         
-        response = self.llm.generate_response(prompt, system_role)
+        # Verdict-only prompt: the cheaper validator model suffices
+        response = self.validator_llm.generate_response(prompt, system_role)
         
         if response:
             # Parse LLM response
             correctness = "CORRECT" if "CORRECT" in response and "INCORRECT" not in response else "INCORRECT"
             has_errors = "logic error" in response.lower() or "missing" in response.lower()
             
-            return {
+            result = {
                 'functionally_correct': correctness == "CORRECT",
                 'analysis': response,
                 'has_errors': has_errors
             }
+            self._cache_put(cache_key, result)
+            return result
         
+        # Failed calls are not cached so a later retry can succeed
         return {
             'functionally_correct': False,
             'analysis': 'Failed to analyze',
             'has_errors': True
         }
     
+    def validate_and_refine_in_one_shot(self, cpp_code: str, design_spec: str,
+                                        structure_issues: List[Dict] = None) -> Dict:
+        """
+        Validate functional correctness and, if wrong, obtain fixed code
+        in a single LLM call
+        
+        The spec+code context is prefilled once per iteration instead of
+        twice (analysis prompt, then a separate refinement prompt), so
+        each refinement iteration costs one LLM round-trip.
+        
+        Args:
+            cpp_code: C++ code to validate
+            design_spec: Original design specification
+            structure_issues: Known structural issues to fold into the fix
+            
+        Returns:
+            Dictionary with 'correctness', 'issues' and optional 'fixed_code'
+        """
+        cache_key = ('oneshot', _content_key(cpp_code, design_spec))
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            return cached
+        
+        # Errors first, deduplicated by type, capped at five
+        selected = _select_issues(structure_issues) if structure_issues else []
+        known_issues = ''
+        if selected:
+            issue_summary = '\n'.join([
+                f"- {issue['type']}: {issue['message']}"
+                for issue in selected
+            ])
+            known_issues = f"""
+Known structural issues to fix:
+{issue_summary}
+"""
+        
+        # Oversized code is windowed to the located issues so prefill
+        # stays within budget; elided regions are restored after parsing
+        segments = {}
+        code_view = cpp_code
+        if len(cpp_code) > _REFINE_CODE_CHAR_BUDGET:
+            code_view, segments = _window_code(cpp_code, selected)
+        elision_note = ''
+        if segments:
+            elision_note = (' In "fixed_code", keep every "// [[ELIDED-n]]" marker line '
+                            'exactly where it is; those regions are unchanged.')
+        
+        prompt = f"""Analyze whether this HLS C++ code correctly implements the specification, and fix it if it does not.
+
+Design Specification:
+{design_spec}
+
+C++ Code:
+{code_view}
+{known_issues}
+Respond with a single JSON object in a ```json fenced block:
+{{
+  "correctness": "CORRECT" | "INCORRECT" | "PARTIAL",
+  "issues": ["specific problem", ...],
+  "fixed_code": "complete corrected C++ code"
+}}
+
+Emit "fixed_code" only if correctness is not CORRECT. Fixed code must be HLS-compatible: no dynamic memory, no recursion, fixed-size arrays only, explicit bit-width types (uint8_t, uint16_t, etc.), all loops bounded.{elision_note}"""
+        
+        system_role = "You are an expert in hardware design and HLS C++ programming. Analyze code against specifications precisely and return only the requested JSON."
+        
+        # fixed_code dominates the response tokens and mostly copies the
+        # input, so backends with Predicted Outputs (OpenAIInterface) get
+        # the shown code as the speculative draft; rejected spans just
+        # decode normally
+        predict = getattr(self.llm, 'generate_with_prediction', None)
+        if predict is not None:
+            response = predict(prompt, system_role, code_view)
+        else:
+            response = self.llm.generate_response(prompt, system_role)
+        
+        if response:
+            result = self._parse_one_shot_response(response)
+            if result is not None:
+                if segments and result['fixed_code']:
+                    # Reassemble the full file; a mangled marker means the
+                    # fix cannot be trusted, so it is dropped
+                    result['fixed_code'] = _splice_elided(result['fixed_code'], segments)
+                self._cache_put(cache_key, result)
+                return result
+        
+        # Failed calls are not cached so a later retry can succeed
+        return {
+            'correctness': 'INCORRECT',
+            'issues': ['Failed to analyze'],
+            'fixed_code': None
+        }
+    
+    def _parse_one_shot_response(self, response: str) -> Optional[Dict]:
+        """Parse the JSON verdict emitted by the one-shot prompt"""
+        candidates = []
+        match = _JSON_BLOCK_RE.search(response)
+        if match:
+            candidates.append(match.group(1))
+        # Fallback: outermost braces. Also rescues fenced payloads whose
+        # fixed_code string contains ``` fences of its own, which truncate
+        # the non-greedy fence match above.
+        start = response.find('{')
+        end = response.rfind('}')
+        if start != -1 and end > start:
+            candidates.append(response[start:end + 1])
+        
+        payload = None
+        for raw in candidates:
+            try:
+                parsed = json.loads(raw)
+            except (ValueError, TypeError):
+                continue
+            if isinstance(parsed, dict):
+                payload = parsed
+                break
+        if payload is None:
+            return None
+        
+        fixed_code = payload.get('fixed_code')
+        if isinstance(fixed_code, str) and '```' in fixed_code:
+            fixed_code = self.extract_cpp_code(fixed_code)
+        if not (isinstance(fixed_code, str) and fixed_code.strip()):
+            fixed_code = None
+        
+        issues = payload.get('issues')
+        return {
+            'correctness': str(payload.get('correctness', 'INCORRECT')).upper(),
+            'issues': issues if isinstance(issues, list) else [],
+            'fixed_code': fixed_code
+        }
+    
+    def validate_cpp_functionality_batch(self, items: List[Tuple[str, str]]) -> List[Dict]:
+        """
+        Validate many (cpp_code, design_spec) pairs concurrently
+        
+        Single validations leave the LLM server idle between requests;
+        fanning a batch out over the pool lets the server batch the
+        decodes. Duplicate pairs are validated once and the memo cache
+        is shared with the single-item path.
+        
+        Args:
+            items: List of (cpp_code, design_spec) tuples
+            
+        Returns:
+            Validation result dictionaries, one per item, in input order
+        """
+        if not items:
+            return []
+        
+        unique = {(code, spec): None for code, spec in items}
+        
+        # Dispatch shortest length bin first; the sort is stable, so
+        # items keep their relative order inside each bin
+        ordered = sorted(unique, key=lambda pair: _length_bin(len(pair[0]) + len(pair[1])))
+        
+        def _validate(pair):
+            return self.validate_cpp_functionality(pair[0], pair[1])
+        
+        for pair, result in zip(ordered, self._batch_pool.map(_validate, ordered)):
+            unique[pair] = result
+        
+        return [unique[(code, spec)] for code, spec in items]
+    
     def should_fix_cpp(self, verilog_errors: List[Dict], cpp_code: str, design_spec: str) -> Dict:
         """
         Determine if Verilog errors stem from C++ issues
@@ -146,31 +600,25 @@ Be concise and specific."""
         Returns:
             Dictionary with decision and reasoning
         """
-        # Quick heuristics
+        # Quick heuristics: score each category with one scan of the
+        # joined error text
         error_messages = ' '.join([e.get('message', '') for e in verilog_errors])
         
-        # Indicators that C++ might be wrong
-        cpp_indicators = [
-            'wrong output',
-            'incorrect result',
-            'mismatch in expected',
-            'logic error',
-            'wrong calculation',
-            'incorrect algorithm'
-        ]
-        
-        # Indicators that it's a Verilog translation issue
-        verilog_indicators = [
-            'synthesis',
-            'timing',
-            'clock',
-            'reset',
-            'sensitivity list',
-            'always block'
-        ]
-        
-        cpp_score = sum(1 for ind in cpp_indicators if ind in error_messages.lower())
-        verilog_score = sum(1 for ind in verilog_indicators if ind in error_messages.lower())
+        # Deterministic short-circuits before any LLM work
+        if not error_messages.strip():
+            self.short_circuit_hits += 1
+            return {'fix_cpp': False, 'reason': 'No error messages to attribute'}
+        
+        if _VERILOG_ONLY_RE.search(error_messages):
+            self.short_circuit_hits += 1
+            return {'fix_cpp': False, 'reason': 'Synthesis-only errors - Verilog translation issue'}
+        
+        cpp_score = len({m.group().lower() for m in _CPP_INDICATOR_RE.finditer(error_messages)})
+        verilog_score = len({m.group().lower() for m in _VERILOG_INDICATOR_RE.finditer(error_messages)})
+        
+        if verilog_score >= _VERILOG_SCORE_SHORT_CIRCUIT:
+            self.short_circuit_hits += 1
+            return {'fix_cpp': False, 'reason': 'Likely Verilog translation issue'}
         
         # If strong Verilog indicators, don't check C++
         if verilog_score > cpp_score:
@@ -201,19 +649,29 @@ Be concise and specific."""
         Returns:
             Refined C++ code or None if refinement fails
         """
-        # Format issues for prompt
+        # Errors first, deduplicated by type, capped at five
+        selected = _select_issues(issues)
         issue_summary = '\n'.join([
             f"- {issue['type']}: {issue['message']}"
-            for issue in issues[:5]  # Limit to first 5 issues
+            for issue in selected
         ])
         
-        prompt = f"""Fix the HLS C++ code based on these issues:
-
-Issues to fix:
-{issue_summary}
-
-Current C++ Code:
-{cpp_code}
+        # Oversized code is windowed to the located issues so prefill
+        # stays within budget; elided regions are restored afterwards
+        segments = {}
+        code_view = cpp_code
+        if len(cpp_code) > _REFINE_CODE_CHAR_BUDGET:
+            code_view, segments = _window_code(cpp_code, selected)
+        elision_note = ''
+        if segments:
+            elision_note = ("\n- Keep every \"// [[ELIDED-n]]\" marker line exactly "
+                            "where it is; those regions are unchanged")
+        
+        # Constant instruction and the design spec lead the prompt; the
+        # per-iteration code and issues follow. Iterations then share
+        # their longest prefix, which servers with prefix/KV caching
+        # skip re-prefilling.
+        prompt = f"""Fix the HLS C++ code below so it meets the design requirements.
 
 Original Design Requirements:
 {design_spec}
@@ -225,18 +683,74 @@ Requirements for fixed code:
 - Ensure all loops are bounded
 - Maintain functional correctness
 
+Current C++ Code:
+{code_view}
+
+Issues to fix:
+{issue_summary}{elision_note}
+
 Provide the complete corrected C++ code:"""
 
         system_role = "You are an HLS C++ expert. Fix code to be synthesis-compatible while maintaining functionality."
         
-        response = self.llm.generate_response(prompt, system_role)
+        response = self._generate_code_response(prompt, system_role,
+                                                predicted_content=code_view)
         
         if response:
             # Extract C++ code from response
-            return self.extract_cpp_code(response)
+            extracted = self.extract_cpp_code(response)
+            if segments and extracted:
+                # Reassemble the full file; a mangled marker means the
+                # response cannot be trusted, so report failure
+                return _splice_elided(extracted, segments)
+            return extracted
         
         return None
     
+    def _generate_code_response(self, prompt: str, system_role: str,
+                                predicted_content: str = None) -> Optional[str]:
+        """
+        Generate a code-producing response, streaming when the backend
+        supports it
+        
+        Refined C++ arrives in a fenced block; once the closing ``` is
+        seen the stream is aborted, skipping any trailing explanation
+        tokens and freeing the server's decode slot. Falls back to the
+        blocking generate_response when the backend cannot stream.
+        
+        When the backend supports speculative Predicted Outputs
+        (OpenAIInterface) and the caller supplies the code being edited,
+        that path is preferred: refined C++ mostly copies its input, so
+        drafted tokens are verified in batch instead of decoded.
+        """
+        if predicted_content:
+            predict = getattr(self.llm, 'generate_with_prediction', None)
+            if predict is not None:
+                response = predict(prompt, system_role, predicted_content)
+                if response:
+                    return response
+        
+        stream = getattr(self.llm, 'generate_stream', None)
+        if stream is None:
+            return self.llm.generate_response(prompt, system_role)
+        
+        chunks = []
+        tail = ""
+        fence_count = 0
+        try:
+            for chunk in stream(prompt, system_role):
+                chunks.append(chunk)
+                # Count fences in (2-char tail + chunk) so a marker split
+                # across chunk boundaries is still seen exactly once
+                fence_count += (tail + chunk).count("```")
+                tail = chunk[-2:]
+                if fence_count >= 2:
+                    break
+            return "".join(chunks).strip() or None
+        except Exception:
+            # Streaming endpoint unavailable - use the blocking path
+            return self.llm.generate_response(prompt, system_role)
+    
     def extract_cpp_code(self, response: str) -> Optional[str]:
         """
         Extract C++ code from LLM response
@@ -250,31 +764,45 @@ Provide the complete corrected C++ code:"""
         if not response:
             return None
         
-        # Look for code blocks
-        lines = response.split('\n')
-        code_lines = []
-        in_block = False
+        # First fenced block, fence lines dropped - one pass in the
+        # C regex engine instead of a Python loop over every line
+        match = _CODE_FENCE_RE.search(response)
+        if match:
+            return match.group(1)
         
-        for line in lines:
-            stripped = line.strip()
-            if stripped.startswith('```'):
-                if in_block:
-                    break
-                else:
-                    in_block = True
-                    continue
-            if in_block:
-                code_lines.append(line)
-        
-        # If no code blocks, try to extract function definitions
-        if not code_lines:
-            for i, line in enumerate(lines):
-                stripped = line.strip()
-                if any(stripped.startswith(kw) for kw in ['#include', 'void ', 'int ', 'uint', 'bool ', 'class ', 'struct ']):
-                    code_lines = lines[i:]
-                    break
+        # Unterminated fence: everything after the opening fence line
+        match = _OPEN_FENCE_RE.search(response)
+        if match:
+            return match.group(1)
+        
+        # No code blocks - take from the first code-looking line
+        match = _CODE_HEADER_RE.search(response)
+        if match:
+            return response[match.start():]
+        
+        return response
+    
+    def validate_and_refine_cpp_many(self, items: List[Tuple[str, str]]) -> List[Tuple[str, Dict]]:
+        """
+        Run the validate-and-refine pipeline for many designs concurrently
+        
+        Each design's pipeline is independent and spends its time waiting
+        on LLM calls, so keeping several in flight lets the server batch
+        them instead of serving one at a time. Uses its own pool rather
+        than _batch_pool, which the per-iteration one-shot calls occupy.
         
-        return '\n'.join(code_lines) if code_lines else response
+        Args:
+            items: List of (cpp_code, design_spec) tuples
+            
+        Returns:
+            (refined_code, validation_info) tuples, one per item, in input order
+        """
+        if not items:
+            return []
+        
+        with ThreadPoolExecutor(max_workers=min(len(items), 8)) as pool:
+            return list(pool.map(
+                lambda item: self.validate_and_refine_cpp(item[0], item[1]), items))
     
     def validate_and_refine_cpp(self, cpp_code: str, design_spec: str, verilog_errors: List[Dict] = None) -> Tuple[str, Dict]:
         """
@@ -292,38 +820,38 @@ Provide the complete corrected C++ code:"""
         current_code = cpp_code
         
         for iteration in range(1, self.max_iterations + 1):
-            # Structural validation
+            # Structural validation (local, memoized regex) runs first
+            # because its issues are folded into the one-shot prompt
             structure_result = self.validate_cpp_structure(current_code)
             
-            # Functional validation
-            func_result = self.validate_cpp_functionality(current_code, design_spec)
+            # Issue the LLM round-trip immediately and overlap the local
+            # bookkeeping with the network wait
+            one_shot_future = self._batch_pool.submit(
+                self.validate_and_refine_in_one_shot,
+                current_code, design_spec, structure_result['issues'])
             
             history.append({
                 'iteration': iteration,
                 'structure_valid': structure_result['valid'],
-                'functionally_correct': func_result['functionally_correct'],
+                'functionally_correct': None,  # filled once the verdict lands
                 'issues': structure_result['issues']
             })
             
+            one_shot = one_shot_future.result()
+            functionally_correct = one_shot['correctness'] == 'CORRECT'
+            history[-1]['functionally_correct'] = functionally_correct
+            
             # If both validations pass, return
-            if structure_result['valid'] and func_result['functionally_correct']:
+            if structure_result['valid'] and functionally_correct:
                 return current_code, {
                     'success': True,
                     'iterations': iteration,
                     'history': history
                 }
             
-            # If not last iteration, try to fix
+            # If not last iteration, adopt the fix from the same response
             if iteration < self.max_iterations:
-                all_issues = structure_result['issues']
-                if not func_result['functionally_correct']:
-                    all_issues.append({
-                        'type': 'functional',
-                        'severity': 'error',
-                        'message': 'Functional correctness issues detected'
-                    })
-                
-                refined_code = self.refine_cpp_code(current_code, all_issues, design_spec, iteration)
+                refined_code = one_shot.get('fixed_code')
                 
                 if refined_code:
                     current_code = refined_code
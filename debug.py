@@ -4,9 +4,7 @@ Debug script to test LLM interface
 """
 
 import sys
-from pathlib import Path
 from llm_interface import OllamaInterface
-from config import Config
 from utils import load_designs
 
 def test_simple_prompt():
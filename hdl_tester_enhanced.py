@@ -13,6 +13,7 @@ from pathlib import Path
 from datetime import datetime
 from typing import Dict, List, Optional
 from config import Config
+from utils import load_generation_details
 
 class MultiDatasetHDLTester:
     def __init__(self, verilog_dir: Path, dataset_dir: Path, result_dir: Path, 
@@ -87,8 +88,11 @@ class MultiDatasetHDLTester:
             }
         }
         
-        # Analyze each design
-        for design_gen in self.generation_info.get("details", []):
+        # Analyze each design; newer runs stream the per-design records
+        # to generation_summary.ndjson instead of embedding them here
+        details = self.generation_info.get("details") \
+            or load_generation_details(self.verilog_dir)
+        for design_gen in details:
             design_name = design_gen["design"]
             
             if design_name not in self.results["design_results"]:
@@ -206,7 +210,9 @@ class MultiDatasetHDLTester:
             "by_design": {}
         }
         
-        for design_gen in self.generation_info.get("details", []):
+        details = self.generation_info.get("details") \
+            or load_generation_details(self.verilog_dir)
+        for design_gen in details:
             design_name = design_gen["design"]
             
             if design_name not in self.results["design_results"]:
@@ -321,8 +327,11 @@ class MultiDatasetHDLTester:
             "by_design": {}
         }
         
-        # Analyze each design
-        for design_gen in self.generation_info.get("details", []):
+        # Analyze each design; newer runs stream the per-design records
+        # to generation_summary.ndjson instead of embedding them here
+        details = self.generation_info.get("details") \
+            or load_generation_details(self.verilog_dir)
+        for design_gen in details:
             design_name = design_gen["design"]
             
             if design_name not in self.results["design_results"]:
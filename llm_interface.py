@@ -6,17 +6,53 @@ Now supports OpenAI GPT-4o API
 
 import subprocess
 import json
+import threading
 import time
 import re
 from typing import Optional, List
 from config import Config
 
+# One HTTP session for the whole process: every model interface talks to
+# the same endpoint(s), so sharing the pool keeps connections alive across
+# all models and layers instead of one pool per interface instance.
+# urllib3's pools are thread-safe, so concurrent layer workers can share it.
+_SHARED_SESSION = None
+_SESSION_LOCK = threading.Lock()
+
+
+def _get_shared_session():
+    """Lazily create the process-wide pooled HTTP session"""
+    global _SHARED_SESSION
+    if _SHARED_SESSION is None:
+        with _SESSION_LOCK:
+            if _SHARED_SESSION is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=64)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                _SHARED_SESSION = session
+    return _SHARED_SESSION
+
+
 class OllamaInterface:
     def __init__(self, model_name: str, temp_mode: str = "low_T"):
         self.model_name = model_name
         self.temp_mode = temp_mode
         self.params = Config.get_model_params(model_name, temp_mode)
-        
+
+    def _get_session(self):
+        """
+        Persistent HTTP session with connection pooling, shared process-wide
+
+        Reusing one session keeps the TCP connections to the endpoint alive
+        across the dozens of calls a MoA trial makes - across all model
+        interfaces - instead of paying connection setup per request.
+        """
+        return _get_shared_session()
+
     def update_temperature_mode(self, temp_mode: str):
         """Update temperature mode and refresh parameters"""
         self.temp_mode = temp_mode
@@ -32,8 +68,8 @@ class OllamaInterface:
     def generate_response(self, prompt: str, system_role: str = None) -> Optional[str]:
         """Generate response with dynamic temperature settings and dataset-aware defaults"""
         try:
-            import requests
-            
+            session = self._get_session()
+
             # Use provided system role or dataset-specific default
             if system_role is None:
                 if "systemverilog" in prompt.lower():
@@ -54,7 +90,7 @@ class OllamaInterface:
                 }
             }
             
-            response = requests.post(
+            response = session.post(
                 "http://localhost:11434/api/generate",
                 json=api_request,
                 timeout=self.params["timeout"]
@@ -85,6 +121,58 @@ class OllamaInterface:
             pass
         return None
     
+    def generate_stream(self, prompt: str, system_role: str = None):
+        """
+        Stream response fragments from Ollama's NDJSON endpoint
+
+        Yields text chunks as they are decoded. The caller may stop iterating
+        early (e.g. once 'endmodule' has arrived) to abort the request and
+        skip the remaining decode time; the connection is closed either way.
+        """
+        session = self._get_session()
+
+        if system_role is None:
+            if "systemverilog" in prompt.lower():
+                system_role = "You are a professional SystemVerilog designer. Provide clean, functional SystemVerilog code without explanations."
+            else:
+                system_role = "You are a professional Verilog designer. Provide clean, functional Verilog code without explanations."
+
+        api_request = {
+            "model": self.model_name,
+            "prompt": f"System: {system_role}\n\nUser: {prompt}",
+            "stream": True,
+            "options": {
+                "temperature": self.params["temperature"],
+                "top_p": self.params["top_p"],
+                "num_predict": self.params["num_predict"],
+                "num_ctx": self.params["context_length"],
+                "stop": ["<|im_end|>", "User:", "System:"]
+            }
+        }
+
+        response = session.post(
+            "http://localhost:11434/api/generate",
+            json=api_request,
+            timeout=self.params["timeout"],
+            stream=True
+        )
+
+        try:
+            if response.status_code != 200:
+                return
+
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                data = json.loads(line)
+                chunk = data.get("response", "")
+                if chunk:
+                    yield chunk
+                if data.get("done"):
+                    break
+        finally:
+            response.close()
+
     def extract_verilog(self, response: str, dataset: str = "rtllm") -> Optional[str]:
         """
         Enhanced Verilog code extraction with multiple strategies
@@ -324,10 +412,13 @@ class OpenAIInterface:
         self.params = Config.get_model_params(model_name, temp_mode)
         self.api_key = api_key or Config.OPENAI_API_KEY
         self.base_url = Config.OPENAI_BASE_URL
-        
+
         if not self.api_key:
             raise ValueError("OpenAI API key not provided. Set OPENAI_API_KEY environment variable or pass api_key parameter.")
-    
+
+    # Same pooled-session behavior as OllamaInterface
+    _get_session = OllamaInterface._get_session
+
     def update_temperature_mode(self, temp_mode: str):
         """Update temperature mode and refresh parameters"""
         self.temp_mode = temp_mode
@@ -336,21 +427,26 @@ class OpenAIInterface:
     def test_connection(self) -> bool:
         """Test OpenAI API connection"""
         try:
-            import requests
+            # Go through the pooled session so the connection opened here is
+            # kept alive and reused by the first real generate call
+            session = self._get_session()
             headers = {
                 "Authorization": f"Bearer {self.api_key}",
                 "Content-Type": "application/json"
             }
-            response = requests.get(f"{self.base_url}/models", headers=headers, timeout=10)
+            response = session.get(f"{self.base_url}/models", headers=headers, timeout=10)
             return response.status_code == 200
         except:
             return False
     
-    def generate_response(self, prompt: str, system_role: str = None) -> Optional[str]:
+    def generate_response(self, prompt: str, system_role: str = None,
+                          prediction: str = None) -> Optional[str]:
         """Generate response using OpenAI API with retry logic"""
         try:
             import requests
-            
+
+            session = self._get_session()
+
             # Use provided system role or dataset-specific default
             if system_role is None:
                 if "systemverilog" in prompt.lower():
@@ -379,11 +475,16 @@ class OpenAIInterface:
                 "stream": False
             }
             
+            if prediction:
+                # Predicted Outputs: server-side speculative decoding for
+                # edit-style prompts whose output mostly copies the input
+                api_request["prediction"] = {"type": "content", "content": prediction}
+            
             # Retry logic for rate limits
             max_retries = 3
             for attempt in range(max_retries):
                 try:
-                    response = requests.post(
+                    response = session.post(
                         f"{self.base_url}/chat/completions",
                         headers=headers,
                         json=api_request,
@@ -422,17 +523,96 @@ class OpenAIInterface:
             return None
         
         return None
-    
-    # Reuse code extraction methods from OllamaInterface
-    def extract_verilog(self, response: str, dataset: str = "rtllm") -> Optional[str]:
-        """Reuse OllamaInterface's extraction logic"""
-        dummy_interface = OllamaInterface("dummy", "low_T")
-        return dummy_interface.extract_verilog(response, dataset)
-    
-    def extract_cpp_code(self, response: str) -> Optional[str]:
-        """Reuse OllamaInterface's C++ extraction logic"""
-        dummy_interface = OllamaInterface("dummy", "low_T")
-        return dummy_interface.extract_cpp_code(response)
+
+    def generate_with_prediction(self, prompt: str, system_role: str = None,
+                                 predicted_content: str = None) -> Optional[str]:
+        """
+        Generate a response with predicted_content as the draft output
+
+        For refinement-style prompts the response is mostly a copy of the
+        input code; passing that input as the prediction lets the server
+        verify drafted tokens in batch instead of decoding them one by
+        one, typically a 2-4x decode speedup on accepted spans.
+        """
+        return self.generate_response(prompt, system_role, prediction=predicted_content)
+
+    def generate_stream(self, prompt: str, system_role: str = None):
+        """
+        Stream response fragments from the OpenAI SSE endpoint
+
+        Yields content deltas as they arrive so the caller can stop early
+        (e.g. once 'endmodule' has been seen) and skip paying for the rest
+        of the completion. Raises on HTTP errors so callers can fall back
+        to the blocking generate_response and its retry logic.
+        """
+        session = self._get_session()
+
+        if system_role is None:
+            if "systemverilog" in prompt.lower():
+                system_role = "You are a professional SystemVerilog designer. Provide clean, functional SystemVerilog code without explanations."
+            else:
+                system_role = "You are a professional Verilog designer. Provide clean, functional Verilog code without explanations."
+
+        headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json"
+        }
+
+        api_request = {
+            "model": self.model_name,
+            "messages": [
+                {"role": "system", "content": system_role},
+                {"role": "user", "content": prompt}
+            ],
+            "temperature": self.params["temperature"],
+            "top_p": self.params["top_p"],
+            "max_tokens": self.params["num_predict"],
+            "stream": True
+        }
+
+        response = session.post(
+            f"{self.base_url}/chat/completions",
+            headers=headers,
+            json=api_request,
+            timeout=self.params["timeout"],
+            stream=True
+        )
+
+        try:
+            if response.status_code != 200:
+                raise RuntimeError(f"OpenAI streaming error: {response.status_code}")
+
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                line = line.decode('utf-8') if isinstance(line, bytes) else line
+                if not line.startswith("data: "):
+                    continue
+                payload = line[len("data: "):]
+                if payload == "[DONE]":
+                    break
+                try:
+                    data = json.loads(payload)
+                except json.JSONDecodeError:
+                    continue
+                delta = data.get("choices", [{}])[0].get("delta", {})
+                content = delta.get("content")
+                if content:
+                    yield content
+        finally:
+            # Closing mid-stream aborts the connection and the completion
+            response.close()
+
+    # Reuse code extraction from OllamaInterface. The extraction helpers
+    # are stateless, so borrowing the functions (same idiom as
+    # _get_session above) avoids constructing a throwaway interface on
+    # every call
+    extract_verilog = OllamaInterface.extract_verilog
+    extract_cpp_code = OllamaInterface.extract_cpp_code
+    _clean_extracted_code = OllamaInterface._clean_extracted_code
+    _extract_code_by_lines = OllamaInterface._extract_code_by_lines
+    _salvage_module_code = OllamaInterface._salvage_module_code
+    _validate_extracted_code = OllamaInterface._validate_extracted_code
 
 
 # NEW: Factory function to create appropriate interface
@@ -448,7 +628,9 @@ def create_llm_interface(model_name: str, temp_mode: str = "low_T", api_key: str
     Returns:
         OllamaInterface or OpenAIInterface instance
     """
-    if Config.is_openai_model(model_name):
+    backend = Config.get_backend(model_name)
+    if backend == "openai":
         return OpenAIInterface(model_name, temp_mode, api_key)
-    else:
-        return OllamaInterface(model_name, temp_mode)
\ No newline at end of file
+    elif backend == "ollama":
+        return OllamaInterface(model_name, temp_mode)
+    raise ValueError(f"Unknown backend '{backend}' for model {model_name}")
\ No newline at end of file
@@ -67,11 +67,11 @@ def main(method: str = "direct", dataset: str = "rtllm", temp_mode: str = "low_T
     print("=" * 70)
     
     # Validate inputs
-    if dataset not in Config.DATASET_TYPES:
+    if dataset not in Config.DATASET_TYPE_SET:
         print(f"Error: Unsupported dataset '{dataset}'. Supported: {Config.DATASET_TYPES}")
         return
     
-    if temp_mode not in Config.TEMPERATURE_MODES:
+    if temp_mode not in Config.TEMPERATURE_MODE_SET:
         print(f"Error: Unsupported temperature mode '{temp_mode}'. Supported: {Config.TEMPERATURE_MODES}")
         return
     
@@ -9,9 +9,25 @@ import os
 import time
 import math
 import argparse
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, List, Tuple, Optional
 
+
+@lru_cache(maxsize=4096)
+def _pass_at_k(n: int, c: int, k: int) -> float:
+    """Memoized hypergeometric core of calculate_pass_at_k
+
+    The distinct (n, c, k) triples repeat across designs, so each
+    combination pays the math.comb big-int arithmetic once per run.
+    """
+    try:
+        prob_all_wrong = math.comb(n - c, k) / math.comb(n, k)
+        return 1.0 - prob_all_wrong
+    except (ValueError, ZeroDivisionError):
+        return 0.0
+
+
 class MetricCalculator:
     def __init__(self, verilog_path: str, dataset: str = "rtllm", 
                  n_samples: int = 10, k_values: List[int] = [1, 3]):
@@ -164,15 +180,10 @@ class MetricCalculator:
         if k > n:
             k = n
         
-        try:
-            if (n - c) < k:
-                return 1.0
-            
-            prob_all_wrong = math.comb(n - c, k) / math.comb(n, k)
-            return 1.0 - prob_all_wrong
-            
-        except (ValueError, ZeroDivisionError):
-            return 0.0
+        if (n - c) < k:
+            return 1.0
+
+        return _pass_at_k(n, c, k)
     
     def get_total_designs(self) -> int:
         """Get total number of designs in dataset"""
@@ -6,6 +6,10 @@ Enhanced with error type identification and detailed error extraction for self-r
 
 import subprocess
 import tempfile
+import hashlib
+import json
+import sqlite3
+import threading
 import os
 import time
 import re
@@ -13,36 +17,106 @@ from pathlib import Path
 from typing import Dict, Optional, Tuple
 from config import Config
 
+# Whitespace normalization for content-addressed caching - reformatted but
+# otherwise identical HDL should hit the same cache entry
+_WHITESPACE_RE = re.compile(r'\s+')
+
+# Maximum number of in-memory cached evaluations before old entries are evicted
+_EVAL_CACHE_MAX_ENTRIES = 4096
+
 class HDLQualityEvaluator:
     def __init__(self, dataset_dir: Path, dataset: str = "rtllm"):
         self.dataset_dir = dataset_dir
         self.dataset = dataset
         self.file_extension = Config.get_file_extension(dataset)
-        
+
+        # Content-addressed memoization of full evaluations - self-refinement
+        # and aggregation frequently re-submit identical HDL, and a cache hit
+        # replaces an iverilog/vvp fork with a hash lookup
+        self._eval_cache = {}
+        self._eval_db = None
+        # Serializes cache mutation when the evaluator is shared across
+        # concurrently generated designs
+        self._cache_lock = threading.Lock()
+
+    def attach_disk_cache(self, db_path: Path):
+        """
+        Back the evaluation cache with an on-disk sqlite store so repeated
+        evaluations survive across trials and processes
+        """
+        try:
+            self._eval_db = sqlite3.connect(str(db_path), check_same_thread=False)
+            self._eval_db.execute(
+                "CREATE TABLE IF NOT EXISTS eval_cache ("
+                "code_hash TEXT, design_name TEXT, quality REAL, details TEXT, "
+                "PRIMARY KEY (code_hash, design_name))"
+            )
+            self._eval_db.commit()
+        except Exception as e:
+            print(f"Warning: Failed to open evaluation cache {db_path}: {e}")
+            self._eval_db = None
+
+    @staticmethod
+    def _cache_key(code: str) -> str:
+        """Hash of whitespace-normalized code for content-addressed lookups"""
+        normalized = _WHITESPACE_RE.sub(' ', code).strip()
+        return hashlib.blake2b(normalized.encode('utf-8'), digest_size=16).hexdigest()
+
+    def _cache_lookup(self, code_hash: str, design_name: str) -> Optional[Tuple[float, Dict]]:
+        """Look up a cached evaluation in memory first, then on disk"""
+        with self._cache_lock:
+            cached = self._eval_cache.get((code_hash, design_name))
+        if cached is not None:
+            quality, error_details = cached
+            return quality, dict(error_details)
+
+        if self._eval_db is not None:
+            try:
+                row = self._eval_db.execute(
+                    "SELECT quality, details FROM eval_cache "
+                    "WHERE code_hash = ? AND design_name = ?",
+                    (code_hash, design_name)
+                ).fetchone()
+                if row:
+                    quality, error_details = row[0], json.loads(row[1])
+                    with self._cache_lock:
+                        self._eval_cache[(code_hash, design_name)] = (quality, error_details)
+                    return quality, dict(error_details)
+            except Exception:
+                pass
+
+        return None
+
+    def _cache_store(self, code_hash: str, design_name: str, quality: float, error_details: Dict):
+        """Store an evaluation result in memory and in the disk cache"""
+        with self._cache_lock:
+            if len(self._eval_cache) >= _EVAL_CACHE_MAX_ENTRIES:
+                self._eval_cache.pop(next(iter(self._eval_cache)))
+            self._eval_cache[(code_hash, design_name)] = (quality, dict(error_details))
+
+        if self._eval_db is not None:
+            try:
+                self._eval_db.execute(
+                    "INSERT OR REPLACE INTO eval_cache VALUES (?, ?, ?, ?)",
+                    (code_hash, design_name, quality, json.dumps(error_details))
+                )
+                self._eval_db.commit()
+            except Exception:
+                pass
+
     def evaluate_quality(self, code: str, design_name: str) -> float:
         """
         Evaluate HDL code quality using iverilog testing with severity-weighted scoring
-        Returns: 
+        Returns:
         - 1.0: Both syntax and function tests pass (highest quality)
         - 0.45-0.85: Only syntax test passes (weighted by error severity)
         - 0.0-0.6: Neither pass, evaluated by fallback rules
+
+        Delegates to evaluate_quality_with_details so identical code hits the
+        shared memoization cache instead of re-running iverilog/vvp.
         """
-        if not code or not code.strip():
-            return 0.0
-        
-        # Step 1: Syntax test
-        syntax_score = self._test_syntax(code)
-        if syntax_score == 0.0:
-            return self._fallback_evaluation(code)
-        
-        # Step 2: Function test (only if syntax passes)
-        function_score = self._test_function(code, design_name)
-        
-        if function_score > 0.0:
-            return 1.0  # Both syntax and function pass - highest quality
-        else:
-            # Syntax passes but function fails - severity-weighted evaluation
-            return self._severity_weighted_evaluation(code)
+        quality, _ = self.evaluate_quality_with_details(code, design_name)
+        return quality
     
     def evaluate_quality_with_details(self, code: str, design_name: str) -> Tuple[float, Dict]:
         """
@@ -75,41 +149,52 @@ class HDLQualityEvaluator:
             error_details["error_type"] = "syntax_error"
             error_details["error_message"] = "Empty or invalid code"
             return 0.0, error_details
-        
+
+        # Check for a previously cached evaluation of identical code
+        code_hash = self._cache_key(code)
+        cached = self._cache_lookup(code_hash, design_name)
+        if cached is not None:
+            return cached
+
         # Step 1: Syntax test with details
         syntax_score, syntax_stderr = self._test_syntax_with_details(code)
-        
+
         if syntax_score == 0.0:
             error_details["syntax_passed"] = False
             error_details["error_type"] = "syntax_error"
             error_details["error_message"] = syntax_stderr
             error_details["stderr"] = syntax_stderr
-            return self._fallback_evaluation(code), error_details
-        
+            quality = self._fallback_evaluation(code)
+            self._cache_store(code_hash, design_name, quality, error_details)
+            return quality, error_details
+
         error_details["syntax_passed"] = True
-        
+
         # Step 2: Function test with details
         function_score, func_stdout, func_stderr, compilation_failed = self._test_function_with_details(code, design_name)
-        
+
         if function_score > 0.0:
             # Both pass
             error_details["passed"] = True
             error_details["function_passed"] = True
+            self._cache_store(code_hash, design_name, 1.0, error_details)
             return 1.0, error_details
         else:
             # Syntax passes but function fails
             error_details["function_passed"] = False
             error_details["stdout"] = func_stdout
             error_details["stderr"] = func_stderr
-            
+
             if compilation_failed:
                 error_details["error_type"] = "compilation_error"
                 error_details["error_message"] = func_stderr
             else:
                 error_details["error_type"] = "simulation_fail"
                 error_details["error_message"] = func_stdout + "\n" + func_stderr
-            
-            return self._severity_weighted_evaluation(code), error_details
+
+            quality = self._severity_weighted_evaluation(code)
+            self._cache_store(code_hash, design_name, quality, error_details)
+            return quality, error_details
     
     def _test_syntax(self, code: str) -> float:
         """Test syntax using iverilog compilation"""
@@ -118,7 +203,7 @@ class HDLQualityEvaluator:
                 f.write(code)
                 temp_file = f.name
             
-            temp_out = f"/tmp/syntax_test_{int(time.time())}.out"
+            temp_out = f"/tmp/syntax_test_{os.getpid()}_{int(time.time())}.out"
             
             # Syntax check with iverilog
             syntax_cmd = ["iverilog", "-g2012", "-o", temp_out, temp_file]
@@ -145,7 +230,7 @@ class HDLQualityEvaluator:
                 f.write(code)
                 temp_file = f.name
             
-            temp_out = f"/tmp/syntax_test_{int(time.time())}.out"
+            temp_out = f"/tmp/syntax_test_{os.getpid()}_{int(time.time())}.out"
             
             syntax_cmd = ["iverilog", "-g2012", "-o", temp_out, temp_file]
             result = subprocess.run(syntax_cmd, capture_output=True, text=True, 
@@ -187,7 +272,7 @@ class HDLQualityEvaluator:
                 f.write(code)
                 code_file = f.name
             
-            temp_out = f"/tmp/func_test_{int(time.time())}.out"
+            temp_out = f"/tmp/func_test_{os.getpid()}_{int(time.time())}.out"
             
             # Compilation with testbench
             if self.dataset == "verilogeval" and ref_file:
@@ -245,7 +330,7 @@ class HDLQualityEvaluator:
                 f.write(code)
                 code_file = f.name
             
-            temp_out = f"/tmp/func_test_{int(time.time())}.out"
+            temp_out = f"/tmp/func_test_{os.getpid()}_{int(time.time())}.out"
             
             # Compilation with testbench
             if self.dataset == "verilogeval" and ref_file:
@@ -63,7 +63,12 @@ class MultiDatasetGenerator:
         
         if Config.ENABLE_CPP_VALIDATION and method == "cpp_chain":
             from cpp_validator import CppValidator
-            self.cpp_validator = CppValidator(llm_interface, Config.MAX_CPP_REFINEMENT_ITERATIONS)
+            validator_llm = None
+            if Config.CPP_VALIDATOR_MODEL:
+                from llm_interface import create_llm_interface
+                validator_llm = create_llm_interface(Config.CPP_VALIDATOR_MODEL, temp_mode)
+            self.cpp_validator = CppValidator(llm_interface, Config.MAX_CPP_REFINEMENT_ITERATIONS,
+                                              validator_llm=validator_llm)
         
         # Cache for C++ code when using cpp_chain
         self.last_cpp_code = None
@@ -39,7 +39,7 @@ def list_models():
     
     print("\nQwen2.5 Models (optimized for this benchmark):")
     for model in qwen25_models:
-        status = " (configured)" if model in Config.QWEN_MODELS else ""
+        status = " (configured)" if model in Config.QWEN_MODEL_SET else ""
         print(f"  {model}{status}")
     
     if other_models:
@@ -187,7 +187,7 @@ def main_cli():
     for arg in sys.argv[:]:
         if arg.startswith("--dataset="):
             dataset = arg.split("=")[1]
-            if dataset not in Config.DATASET_TYPES:
+            if dataset not in Config.DATASET_TYPE_SET:
                 print(f"Error: Invalid dataset '{dataset}'. Supported: {Config.DATASET_TYPES}")
                 return
             print(f"✓ Dataset: {dataset}")
@@ -199,7 +199,7 @@ def main_cli():
     for arg in sys.argv[:]:
         if arg.startswith("--temp="):
             temp_mode = arg.split("=")[1]
-            if temp_mode not in Config.TEMPERATURE_MODES:
+            if temp_mode not in Config.TEMPERATURE_MODE_SET:
                 print(f"Error: Invalid temperature mode '{temp_mode}'. Supported: {Config.TEMPERATURE_MODES}")
                 return
             print(f"✓ Temperature: {temp_mode}")
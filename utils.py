@@ -3,11 +3,72 @@
 Utility functions for Qwen2.5 RTLLM (Verilog) and VerilogEval (SystemVerilog) benchmark
 """
 
+import json
 import subprocess
+import threading
+import time
 from pathlib import Path
-from typing import List, Dict
+from typing import Dict, Iterator, List
 from config import Config
 
+class TokenBucket:
+    """
+    Monotonic-clock token bucket for pacing LLM API requests
+
+    Blocks acquire() only when the observed request rate approaches the
+    configured quota, instead of sleeping a fixed amount after every trial.
+    Thread-safe so concurrent designs share one bucket.
+    """
+    def __init__(self, rate_per_sec: float, capacity: float = None):
+        self.rate = rate_per_sec
+        self.capacity = capacity if capacity is not None else max(1.0, rate_per_sec)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a request token is available, then consume it"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity,
+                                   self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return
+                wait = (1.0 - self._tokens) / self.rate
+            time.sleep(wait)
+
+def load_generation_details(verilog_dir: Path) -> Iterator[Dict]:
+    """Yield per-design generation records for a run, lazily
+
+    Newer runs stream one JSON object per design to
+    generation_summary.ndjson; older summaries embed the same records
+    as the "details" list inside generation_summary.json. One record is
+    held at a time either way.
+    """
+    verilog_dir = Path(verilog_dir)
+
+    ndjson_path = verilog_dir / "generation_summary.ndjson"
+    if ndjson_path.exists():
+        with open(ndjson_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+        return
+
+    summary_path = verilog_dir / "generation_summary.json"
+    if summary_path.exists():
+        try:
+            with open(summary_path, 'r', encoding='utf-8') as f:
+                summary = json.load(f)
+        except Exception as e:
+            print(f"Warning: Could not load generation summary: {e}")
+            return
+        yield from summary.get("details", [])
+
 def check_dependencies() -> bool:
     """Check if required tools are available"""
     try: